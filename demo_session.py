@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """Demo script for ShellSidekick session monitoring."""
 
-import time
+import re
 from datetime import datetime
 from shellsidekick.models.session import Session, SessionType, SessionState
 from shellsidekick.core.monitor import SessionMonitor
 from shellsidekick.core.detector import PromptDetector
+from shellsidekick.utils.file_utils import read_tail_lines
+
+# "delete" in any case, or an upper-case WARNING banner, in one scan
+DANGER_CONTEXT_RE = re.compile(r"(?i:delete)|WARNING")
+
 
 def demo():
     print("=" * 60)
@@ -34,11 +39,9 @@ def demo():
         f.write("Please authenticate to continue.\n")
         f.write("Password: ")
 
-    time.sleep(0.5)
-
     # Step 3: Get updates
     print("\n[Step 3] Checking for new content...")
-    new_content, has_more = monitor.get_updates()
+    new_content, has_more = monitor.wait_for_update(timeout=0.5)
     print(f"✓ New content detected ({len(new_content)} characters)")
     print(f"  Content: {repr(new_content[:50])}...")
 
@@ -46,11 +49,14 @@ def demo():
     print("\n[Step 4] Detecting input prompt...")
     detector = PromptDetector(min_confidence=0.70)
 
-    # Read full log file for detection (includes the Password: prompt we just added)
-    with open("/tmp/test-session.log", "r") as f:
-        full_content = f.read()
+    # Read the log tail for detection (includes the Password: prompt we just added);
+    # the detector only looks at the last 50 lines anyway. The tail is only scanned
+    # when the new content could have completed a prompt
+    recent_content = read_tail_lines("/tmp/test-session.log", max_lines=50)
 
-    detection = detector.detect(full_content, file_position=monitor.session.file_position)
+    detection = detector.detect_delta(
+        new_content, recent_content, file_position=monitor.session.file_position
+    )
 
     if detection:
         print(f"✓ PROMPT DETECTED!")
@@ -68,10 +74,8 @@ def demo():
         f.write("\n\nWARNING: This will delete all data!\n")
         f.write("Continue? (yes/no): ")
 
-    time.sleep(0.5)
-
     # Get new updates and detect - focus on new content only
-    new_content, _ = monitor.get_updates()
+    new_content, _ = monitor.wait_for_update(timeout=0.5)
 
     # Detect prompt in the new content
     detection = detector.detect(new_content, file_position=monitor.session.file_position)
@@ -83,7 +87,7 @@ def demo():
         print(f"  Confidence: {detection.confidence:.2%}")
 
         # Check if surrounding text contains dangerous keywords
-        if "delete" in new_content.lower() or "WARNING" in new_content:
+        if DANGER_CONTEXT_RE.search(new_content):
             print(f"  ⚠️  Context contains dangerous keywords!")
         print(f"  Dangerous flag: {detection.is_dangerous}")
 
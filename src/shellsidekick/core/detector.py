@@ -1,96 +1,174 @@
 """Prompt detection with regex patterns."""
 
 import re
-from dataclasses import dataclass
-from datetime import datetime
+import time
+from dataclasses import dataclass, field
 from typing import Optional
 
 from shellsidekick.models.prompt import PromptDetection, PromptType
 from shellsidekick.utils.security import is_dangerous_operation
 
 
-@dataclass
+@dataclass(slots=True)
 class PromptPattern:
     """A prompt detection pattern."""
 
     regex: re.Pattern
     prompt_type: PromptType
     confidence: float  # Base confidence (0.0-1.0)
+    # Lowercase literals of which at least one must occur for the regex to match
+    literals: tuple[str, ...]
+    pattern_str: str = field(init=False)  # regex source, cached for PromptDetection
+
+    def __post_init__(self):
+        self.pattern_str = self.regex.pattern
 
 
 # Prompt detection patterns (ordered by specificity)
+# Quantifiers are possessive wherever the following token can never be matched
+# by the repeated one, so the backtracking engine never revisits those spans.
 PROMPT_PATTERNS = [
     # Password prompts (highest priority)
     PromptPattern(
-        regex=re.compile(r"password\s*:", re.IGNORECASE),
+        regex=re.compile(r"password\s*+:", re.IGNORECASE),
         prompt_type=PromptType.PASSWORD,
         confidence=0.95,
+        literals=("password",),
     ),
     PromptPattern(
-        regex=re.compile(r"passphrase\s*:", re.IGNORECASE),
+        regex=re.compile(r"passphrase\s*+:", re.IGNORECASE),
         prompt_type=PromptType.PASSWORD,
         confidence=0.95,
+        literals=("passphrase",),
     ),
     PromptPattern(
-        regex=re.compile(r"enter\s+(?:your\s+)?password", re.IGNORECASE),
+        regex=re.compile(r"enter\s++(?:your\s++)?password", re.IGNORECASE),
         prompt_type=PromptType.PASSWORD,
         confidence=0.92,
+        literals=("password",),
     ),
     # Yes/No prompts
     PromptPattern(
         regex=re.compile(r"\(yes/no\)|\[y/n\]|\(y/n\)", re.IGNORECASE),
         prompt_type=PromptType.YES_NO,
         confidence=0.90,
+        literals=("(yes/no)", "[y/n]", "(y/n)"),
     ),
     PromptPattern(
         regex=re.compile(r"continue\?|proceed\?|confirm\?", re.IGNORECASE),
         prompt_type=PromptType.YES_NO,
         confidence=0.85,
+        literals=("continue?", "proceed?", "confirm?"),
     ),
     # Path prompts
     PromptPattern(
         regex=re.compile(
-            r"enter\s+(?:file\s+)?path\s*:|(?:file|directory)\s+path\s*:", re.IGNORECASE
+            r"enter\s++(?:file\s++)?path\s*+:|(?:file|directory)\s++path\s*+:", re.IGNORECASE
         ),
         prompt_type=PromptType.PATH,
         confidence=0.88,
+        literals=("path",),
     ),
     PromptPattern(
-        regex=re.compile(r"(?:file|directory)\s+name\s*:", re.IGNORECASE),
+        regex=re.compile(r"(?:file|directory)\s++name\s*+:", re.IGNORECASE),
         prompt_type=PromptType.PATH,
         confidence=0.82,
+        literals=("name",),
     ),
     # Choice prompts (numbered lists)
     PromptPattern(
-        regex=re.compile(r"^\s*\[\d+\].*(?:\n\s*\[\d+\].*)+", re.MULTILINE),
+        regex=re.compile(r"^\s*+\[\d++\].*+(?:\n\s*+\[\d++\].*+)+", re.MULTILINE),
         prompt_type=PromptType.CHOICE,
         confidence=0.82,
+        literals=("[",),
     ),
     # Command prompts
     PromptPattern(
-        regex=re.compile(r"enter\s+command\s*:|command\s*:", re.IGNORECASE),
+        regex=re.compile(r"enter\s++command\s*+:|command\s*+:", re.IGNORECASE),
         prompt_type=PromptType.COMMAND,
         confidence=0.85,
+        literals=("command",),
     ),
     # Generic text input
     PromptPattern(
-        regex=re.compile(r"enter\s+\w+\s*:|input\s*:", re.IGNORECASE),
+        regex=re.compile(r"enter\s++\w++\s*+:|input\s*+:", re.IGNORECASE),
         prompt_type=PromptType.TEXT,
         confidence=0.75,
+        literals=("enter", "input"),
     ),
 ]
 
 
+# The detection window is the last DETECTION_WINDOW_LINES lines of the buffer,
+# capped at DETECTION_WINDOW_CHARS characters so a few huge lines can't make a
+# single detect() scan grow with the buffer
+DETECTION_WINDOW_LINES = 50
+DETECTION_WINDOW_CHARS = 16_384
+
+# Every prompt pattern ends in (or requires) one of these characters, except a
+# bare "enter password", which is checked for separately
+_TRIGGER_CHARS = ":?])"
+_PASSWORD_WORD_RE = re.compile("password", re.IGNORECASE)
+
+
+def _may_contain_prompt(text: str) -> bool:
+    """Cheap pre-check: False only if no prompt pattern can match text.
+
+    A handful of C-level substring tests, far cheaper than running the prompt
+    regexes over text that holds no prompt punctuation at all.
+    """
+    for char in _TRIGGER_CHARS:
+        if char in text:
+            return True
+    return _PASSWORD_WORD_RE.search(text) is not None
+
+
+def _tail_lines(text: str, count: int, max_chars: Optional[int] = None) -> str:
+    """Return the last ``count`` lines of text without splitting the whole string.
+
+    Same result as splitting on newlines and re-joining the last ``count``
+    pieces, but walks back from the end with ``rfind`` so only the tail is
+    ever copied.
+
+    With ``max_chars``, the walk stops at that many characters from the end;
+    the window then starts at the first line beginning inside the limit, or
+    mid-line if the last line alone is longer.
+    """
+    floor = 0
+    if max_chars is not None and len(text) > max_chars:
+        floor = len(text) - max_chars
+
+    pos = len(text)
+    for _ in range(count):
+        pos = text.rfind("\n", floor, pos)
+        if pos == -1:
+            if floor == 0:
+                return text
+            if text[floor - 1] == "\n":
+                return text[floor:]
+            # Drop the partial line at the cut, unless it is all there is
+            first_newline = text.find("\n", floor)
+            if first_newline == -1 or first_newline == len(text) - 1:
+                return text[floor:]
+            return text[first_newline + 1 :]
+    return text[pos + 1 :]
+
+
 class PromptDetector:
     """Detects prompts waiting for user input in terminal output."""
 
-    def __init__(self, min_confidence: float = 0.70):
+    def __init__(
+        self, min_confidence: float = 0.70, max_window_chars: int = DETECTION_WINDOW_CHARS
+    ):
         """Initialize prompt detector.
 
         Args:
             min_confidence: Minimum confidence threshold for detection
+            max_window_chars: Most characters from the end of the buffer scanned
+                per detection
         """
         self.min_confidence = min_confidence
+        self.max_window_chars = max_window_chars
 
     def detect(self, content: str, file_position: int = 0) -> Optional[PromptDetection]:
         """Detect if content contains a prompt waiting for input.
@@ -102,33 +180,97 @@ class PromptDetector:
         Returns:
             PromptDetection if a prompt is found, None otherwise
         """
+        return self._detect(content, file_position)[0]
+
+    def _detect(
+        self, content: str, file_position: int = 0
+    ) -> tuple[Optional[PromptDetection], int]:
+        """Detect a prompt and report where its text starts in content.
+
+        Returns:
+            Tuple of (PromptDetection or None, offset of the prompt text in
+            content, or -1 when nothing was detected)
+        """
         if not content:
-            return None
+            return None, -1
+
+        # Focus on the last lines (prompts typically appear at end)
+        recent_lines = _tail_lines(content, DETECTION_WINDOW_LINES, self.max_window_chars)
 
-        # Focus on last 50 lines (prompts typically appear at end)
-        lines = content.split("\n")
-        recent_lines = "\n".join(lines[-50:])
+        # Plain output without prompt punctuation can't match any pattern
+        if not _may_contain_prompt(recent_lines):
+            return None, -1
 
-        # Try each pattern in order
+        # Lowercased copy for the literal pre-checks; only safe for ASCII, since
+        # IGNORECASE also folds a few non-ASCII characters onto ASCII letters
+        lowered = recent_lines.lower() if recent_lines.isascii() else None
+
+        # Try each pattern in priority order, skipping the regex whenever none
+        # of its required literals are present
         for pattern in PROMPT_PATTERNS:
+            if pattern.confidence < self.min_confidence:
+                continue
+            if lowered is not None and not any(lit in lowered for lit in pattern.literals):
+                continue
             match = pattern.regex.search(recent_lines)
-            if match and pattern.confidence >= self.min_confidence:
-                prompt_text = match.group(0).strip()
+            if match:
+                matched = match.group(0)
+                prompt_text = matched.strip()
+
+                # Offset of the stripped prompt text within the full content
+                offset = (
+                    len(content)
+                    - len(recent_lines)
+                    + match.start()
+                    + len(matched)
+                    - len(matched.lstrip())
+                )
 
                 # Check if this is a dangerous operation
                 is_dangerous = is_dangerous_operation(prompt_text)
 
-                return PromptDetection(
+                detection = PromptDetection(
                     prompt_text=prompt_text,
                     confidence=pattern.confidence,
                     prompt_type=pattern.prompt_type,
-                    matched_pattern=pattern.regex.pattern,
+                    matched_pattern=pattern.pattern_str,
                     file_position=file_position,
-                    timestamp=datetime.now(),
+                    timestamp_ns=time.time_ns(),
                     is_dangerous=is_dangerous,
                 )
+                return detection, offset
+
+        return None, -1
+
+    def detect_delta(
+        self, new_content: str, content: str, file_position: int = 0
+    ) -> Optional[PromptDetection]:
+        """Detect a prompt only if newly appended output could have completed one.
+
+        Intended for polling loops: when the delta since the last poll holds no
+        prompt punctuation (the user is still typing, or plain output scrolled
+        by), any prompt in the buffer was already reported and the regex scan
+        is skipped entirely. The bare "enter password" prompt has no punctuation,
+        so its keyword is looked for in the buffer tail around the delta, where
+        a word split across polls still shows up whole.
+
+        Args:
+            new_content: Text appended since the previous poll
+            content: Buffer to scan when the delta looks relevant (includes new_content)
+            file_position: Position in log file (for tracking)
 
-        return None
+        Returns:
+            PromptDetection if a prompt is found, None otherwise
+        """
+        if not new_content:
+            return None
+
+        if not any(ch in new_content for ch in _TRIGGER_CHARS):
+            tail = content[-(len(new_content) + len("password")) :]
+            if not _PASSWORD_WORD_RE.search(tail):
+                return None
+
+        return self.detect(content, file_position)
 
     def detect_with_context(
         self, content: str, file_position: int = 0, context_lines: int = 3
@@ -143,24 +285,27 @@ class PromptDetector:
         Returns:
             Tuple of (PromptDetection, context_lines) if found, None otherwise
         """
-        detection = self.detect(content, file_position)
+        detection, offset = self._detect(content, file_position)
         if not detection:
             return None
 
-        # Extract context
-        lines = content.split("\n")
-        # Find the line with the prompt
-        prompt_line_idx = None
-        for idx, line in enumerate(lines):
-            if detection.prompt_text in line:
-                prompt_line_idx = idx
+        # Start of the line holding the prompt, then walk outwards with
+        # rfind/find so only the context lines are ever split out
+        line_start = content.rfind("\n", 0, offset) + 1
+
+        start = line_start
+        for _ in range(context_lines):
+            if start == 0:
+                break
+            start = content.rfind("\n", 0, start - 1) + 1
+
+        end = line_start - 1
+        for _ in range(context_lines + 1):
+            end = content.find("\n", end + 1)
+            if end == -1:
+                end = len(content)
                 break
 
-        if prompt_line_idx is not None:
-            start_idx = max(0, prompt_line_idx - context_lines)
-            end_idx = min(len(lines), prompt_line_idx + context_lines + 1)
-            context = lines[start_idx:end_idx]
-        else:
-            context = lines[-context_lines - 1 :]
+        context = content[start:end].split("\n")
 
         return detection, context
@@ -2,15 +2,22 @@
 
 import re
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
 
 from shellsidekick.models.prompt import PromptType
 from shellsidekick.utils.security import is_dangerous_operation
 
+# Maximum number of learned responses surfaced as suggestions for one prompt
+MAX_PATTERN_SUGGESTIONS = 10
 
-@dataclass
+# Choice numbers in numbered menus, e.g. [1], [2], [3]
+_CHOICE_RE = re.compile(r"\[(\d+)\]")
+
+
+@dataclass(frozen=True, slots=True)
 class InputSuggestion:
-    """A suggested input with confidence and reasoning."""
+    """A suggested input with confidence and reasoning (immutable, so shareable)."""
 
     input_text: str
     confidence: float  # 0.0-1.0
@@ -27,6 +34,76 @@ class InputSuggestion:
         }
 
 
+# Fixed default suggestions, built once and shared by every call
+_NO_SUGGESTIONS: tuple[InputSuggestion, ...] = ()
+
+_PATH_SUGGESTIONS = (
+    InputSuggestion(
+        input_text="./",
+        confidence=0.70,
+        source="default",
+        reasoning="Current directory (relative path)",
+    ),
+    InputSuggestion(
+        input_text="/tmp/", confidence=0.65, source="default", reasoning="Temporary directory"
+    ),
+    InputSuggestion(
+        input_text="/home/", confidence=0.65, source="default", reasoning="Home directory"
+    ),
+)
+
+_DANGEROUS_YES_NO_SUGGESTIONS = (
+    InputSuggestion(
+        input_text="no",
+        confidence=0.85,
+        source="default",
+        reasoning="Recommended: Dangerous operation detected. Saying 'no' is the safer choice.",
+    ),
+    InputSuggestion(
+        input_text="yes",
+        confidence=0.60,
+        source="default",
+        reasoning=(
+            "⚠️  Proceed with caution: This will execute a potentially dangerous operation."
+        ),
+    ),
+)
+
+_YES_NO_SUGGESTIONS = (
+    InputSuggestion(
+        input_text="yes", confidence=0.75, source="default", reasoning="Confirm the operation"
+    ),
+    InputSuggestion(
+        input_text="no", confidence=0.75, source="default", reasoning="Cancel the operation"
+    ),
+)
+
+_COMMAND_SUGGESTIONS = tuple(
+    InputSuggestion(input_text=cmd, confidence=0.60, source="default", reasoning=description)
+    for cmd, description in (
+        ("help", "Display help information"),
+        ("exit", "Exit the current session"),
+        ("status", "Check status"),
+        ("ls", "List directory contents"),
+    )
+)
+
+
+@lru_cache(maxsize=256)
+def _choice_suggestions(prompt_text: str) -> tuple[InputSuggestion, ...]:
+    """Build the suggestions for a numbered menu, once per distinct menu text."""
+    # Extract choice numbers from prompt (e.g., [1], [2], [3])
+    return tuple(
+        InputSuggestion(
+            input_text=num,
+            confidence=0.80,
+            source="default",
+            reasoning=f"Select option {num}",
+        )
+        for num in _CHOICE_RE.findall(prompt_text)
+    )
+
+
 class InputInferenceEngine:
     """Infers expected inputs based on prompt context."""
 
@@ -54,13 +131,15 @@ class InputInferenceEngine:
             session_context: Optional session context (metadata, history)
 
         Returns:
-            Tuple of (suggestions, warnings)
+            Tuple of (suggestions, warnings); the suggestions list is the
+            caller's own, even where the defaults are shared
         """
         suggestions = []
         warnings = []
 
-        # Check for dangerous operations
-        if is_dangerous_operation(prompt_text):
+        # Check for dangerous operations (computed once, reused below)
+        is_dangerous = is_dangerous_operation(prompt_text)
+        if is_dangerous:
             warnings.append(
                 "⚠️  Dangerous operation detected: This prompt involves potentially "
                 "destructive actions. Review carefully before proceeding."
@@ -77,7 +156,7 @@ class InputInferenceEngine:
             )
 
         elif prompt_type == PromptType.YES_NO:
-            suggestions = self._suggest_yes_no_inputs(prompt_text, session_context)
+            suggestions = self._suggest_yes_no_inputs(prompt_text, session_context, is_dangerous)
 
         elif prompt_type == PromptType.CHOICE:
             suggestions = self._suggest_choice_inputs(prompt_text)
@@ -92,110 +171,71 @@ class InputInferenceEngine:
             suggestions = self._suggest_text_inputs(prompt_text, session_context)
 
         else:  # UNKNOWN
-            suggestions = []
+            suggestions = _NO_SUGGESTIONS
             warnings.append("Unknown prompt type - manual input required")
 
         # Merge pattern suggestions with defaults
         # Pattern suggestions get priority (higher confidence)
         if pattern_suggestions:
-            # Create a map of default suggestions by input_text for easy lookup
-            default_map = {s.input_text: s for s in suggestions}
-
-            # Add pattern suggestions (they override defaults with higher confidence)
-            merged = []
-            for pattern_sugg in pattern_suggestions:
-                merged.append(pattern_sugg)
-                # Remove from defaults if it exists (pattern takes priority)
-                default_map.pop(pattern_sugg.input_text, None)
+            # Insertion-ordered dict: pattern suggestions first, then defaults
+            # only for inputs the patterns didn't already cover
+            merged = {s.input_text: s for s in pattern_suggestions}
+            for default_sugg in suggestions:
+                merged.setdefault(default_sugg.input_text, default_sugg)
 
-            # Add remaining defaults that weren't covered by patterns
-            merged.extend(default_map.values())
+            return list(merged.values()), warnings
 
-            suggestions = merged
+        # The defaults may be module-level tuples or cached; hand out a copy
+        return list(suggestions), warnings
 
-        return suggestions, warnings
-
-    def _suggest_password_inputs(self) -> List[InputSuggestion]:
+    def _suggest_password_inputs(self) -> Sequence[InputSuggestion]:
         """Suggest inputs for password prompts (none - security)."""
-        return []
+        return _NO_SUGGESTIONS
 
     def _suggest_yes_no_inputs(
-        self, prompt_text: str, session_context: Optional[Dict] = None
-    ) -> List[InputSuggestion]:
-        """Suggest yes/no inputs."""
-        suggestions = []
+        self,
+        prompt_text: str,
+        session_context: Optional[Dict] = None,
+        is_dangerous: Optional[bool] = None,
+    ) -> Sequence[InputSuggestion]:
+        """Suggest yes/no inputs.
 
+        Args:
+            prompt_text: The detected prompt text
+            session_context: Optional session context
+            is_dangerous: Precomputed danger flag (computed from prompt_text if None)
+        """
         # Check if this is a dangerous operation
-        is_dangerous = is_dangerous_operation(prompt_text)
+        if is_dangerous is None:
+            is_dangerous = is_dangerous_operation(prompt_text)
 
         if is_dangerous:
             # Suggest "no" with higher confidence for dangerous operations
-            suggestions.append(
-                InputSuggestion(
-                    input_text="no",
-                    confidence=0.85,
-                    source="default",
-                    reasoning=(
-                        "Recommended: Dangerous operation detected. "
-                        "Saying 'no' is the safer choice."
-                    ),
-                )
-            )
-            suggestions.append(
-                InputSuggestion(
-                    input_text="yes",
-                    confidence=0.60,
-                    source="default",
-                    reasoning=(
-                        "⚠️  Proceed with caution: This will execute a "
-                        "potentially dangerous operation."
-                    ),
-                )
-            )
-        else:
-            # Normal yes/no suggestions
-            context_info = ""
-            if session_context and "working_directory" in session_context:
-                context_info = f" (working directory: {session_context['working_directory']})"
+            return _DANGEROUS_YES_NO_SUGGESTIONS
 
-            suggestions.append(
-                InputSuggestion(
-                    input_text="yes",
-                    confidence=0.75,
-                    source="default",
-                    reasoning=f"Confirm the operation{context_info}",
-                )
-            )
-            suggestions.append(
-                InputSuggestion(
-                    input_text="no",
-                    confidence=0.75,
-                    source="default",
-                    reasoning=f"Cancel the operation{context_info}",
-                )
-            )
+        if not (session_context and "working_directory" in session_context):
+            return _YES_NO_SUGGESTIONS
 
-        return suggestions
+        # Normal yes/no suggestions, mentioning the working directory
+        context_info = f" (working directory: {session_context['working_directory']})"
+        return [
+            InputSuggestion(
+                input_text="yes",
+                confidence=0.75,
+                source="default",
+                reasoning=f"Confirm the operation{context_info}",
+            ),
+            InputSuggestion(
+                input_text="no",
+                confidence=0.75,
+                source="default",
+                reasoning=f"Cancel the operation{context_info}",
+            ),
+        ]
 
-    def _suggest_choice_inputs(self, prompt_text: str) -> List[InputSuggestion]:
+    def _suggest_choice_inputs(self, prompt_text: str) -> Sequence[InputSuggestion]:
         """Suggest inputs for numbered choice prompts."""
-        suggestions = []
-
-        # Extract choice numbers from prompt (e.g., [1], [2], [3])
-        pattern = r"\[(\d+)\]"
-        matches = re.findall(pattern, prompt_text)
-
-        for num in matches:
-            suggestions.append(
-                InputSuggestion(
-                    input_text=num,
-                    confidence=0.80,
-                    source="default",
-                    reasoning=f"Select option {num}",
-                )
-            )
-
-        return suggestions
+        return _choice_suggestions(prompt_text)
 
     def _suggest_path_inputs(
         self, prompt_text: str, session_context: Optional[Dict] = None
@@ -203,73 +243,34 @@ class InputInferenceEngine:
         """Suggest path inputs."""
         suggestions = []
 
-        # Suggest current directory
-        suggestions.append(
-            InputSuggestion(
-                input_text="./",
-                confidence=0.70,
-                source="default",
-                reasoning="Current directory (relative path)",
-            )
-        )
-
-        # Suggest common directories
-        suggestions.append(
-            InputSuggestion(
-                input_text="/tmp/",
-                confidence=0.65,
-                source="default",
-                reasoning="Temporary directory",
-            )
-        )
-
-        suggestions.append(
-            InputSuggestion(
-                input_text="/home/", confidence=0.65, source="default", reasoning="Home directory"
-            )
-        )
-
-        # Context-aware suggestion
+        # Context-aware suggestion first
         if session_context and "working_directory" in session_context:
             wd = session_context["working_directory"]
-            suggestions.insert(
-                0,
+            suggestions.append(
                 InputSuggestion(
                     input_text=wd,
                     confidence=0.80,
                     source="context_inference",
                     reasoning="Current working directory from session context",
-                ),
+                )
             )
 
+        # Current directory and common directories
+        suggestions.extend(_PATH_SUGGESTIONS)
+
         return suggestions
 
     def _suggest_command_inputs(self, prompt_text: str) -> List[InputSuggestion]:
         """Suggest safe command inputs."""
-        common_commands = [
-            ("help", "Display help information"),
-            ("exit", "Exit the current session"),
-            ("status", "Check status"),
-            ("ls", "List directory contents"),
-        ]
-
-        suggestions = []
-        for cmd, description in common_commands:
-            suggestions.append(
-                InputSuggestion(
-                    input_text=cmd, confidence=0.60, source="default", reasoning=description
-                )
-            )
-
-        return suggestions
+        return list(_COMMAND_SUGGESTIONS)
 
     def _suggest_text_inputs(
         self, prompt_text: str, session_context: Optional[Dict] = None
-    ) -> List[InputSuggestion]:
+    ) -> Sequence[InputSuggestion]:
         """Suggest generic text inputs."""
         # For generic text prompts, we can't make good suggestions
-        # Return empty list - user must provide input
-        return []
+        # Return no suggestions - user must provide input
+        return _NO_SUGGESTIONS
 
     def _get_pattern_suggestions(self, prompt_text: str) -> List[InputSuggestion]:
         """Get suggestions based on learned patterns.
@@ -291,32 +292,33 @@ class InputInferenceEngine:
         suggestions = []
 
         # Generate suggestions from pattern responses
-        # Sort responses by count (most common first)
-        sorted_responses = sorted(pattern.responses.items(), key=lambda x: x[1].count, reverse=True)
+        # Only the most common responses are surfaced (most common first)
+        top_responses = pattern.responses.most_common(MAX_PATTERN_SUGGESTIONS)
+
+        # Per-pattern invariants, hoisted out of the per-response loop
+        total = pattern.total_occurrences
+        boost = total >= 10
 
-        for input_text, stats in sorted_responses:
+        for input_text, stats in top_responses:
             # Calculate confidence based on:
             # - Frequency (how many times this response was used)
             # - Success rate (how often it worked)
             # - Total occurrences (more data = higher confidence)
-
-            # Frequency score: normalize by total occurrences
-            frequency_score = stats.count / pattern.total_occurrences
-
-            # Success rate score
+            count = stats.count
+            frequency_score = count / total
             success_score = stats.success_rate
 
             # Combine scores with weights (70% frequency, 30% success)
             confidence = (frequency_score * 0.70) + (success_score * 0.30)
 
             # Boost confidence for patterns with more data
-            if pattern.total_occurrences >= 10:
+            if boost:
                 confidence = min(0.95, confidence + 0.05)
 
             reasoning = (
-                f"Learned from pattern: used {stats.count}/{pattern.total_occurrences} times "
-                f"({stats.count/pattern.total_occurrences*100:.0f}%), "
-                f"{stats.success_rate*100:.0f}% success rate"
+                f"Learned from pattern: used {count}/{total} times "
+                f"({frequency_score*100:.0f}%), "
+                f"{success_score*100:.0f}% success rate"
             )
 
             suggestions.append(
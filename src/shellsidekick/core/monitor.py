@@ -1,9 +1,12 @@
 """Session monitoring with file position tracking."""
 
+import os
+import time
+import weakref
 from datetime import datetime
 
 from shellsidekick.models.session import Session, SessionState
-from shellsidekick.utils.file_utils import get_file_size, read_from_position
+from shellsidekick.utils.file_utils import close_file, read_from_position
 
 
 class SessionMonitor:
@@ -16,6 +19,9 @@ class SessionMonitor:
             session: Session entity to monitor
         """
         self.session = session
+        # Release the descriptor kept open for incremental reads on stop(), or
+        # when the monitor is dropped without being stopped
+        self._close_log = weakref.finalize(self, close_file, session.log_file)
 
     def get_updates(self) -> tuple[str, bool]:
         """Read new content since last check.
@@ -30,7 +36,7 @@ class SessionMonitor:
             PermissionError: If log file is not readable
         """
         try:
-            new_content, new_position = read_from_position(
+            new_content, new_position, current_size = read_from_position(
                 self.session.log_file, self.session.file_position
             )
 
@@ -38,7 +44,6 @@ class SessionMonitor:
             self.session.file_position = new_position
 
             # Check if there's more content (file grew during read)
-            current_size = get_file_size(self.session.log_file)
             has_more = new_position < current_size
 
             return new_content, has_more
@@ -52,6 +57,42 @@ class SessionMonitor:
             self.session.state = SessionState.STOPPED
             raise
 
+    def wait_for_update(
+        self, timeout: float = 1.0, poll_interval: float = 0.05
+    ) -> tuple[str, bool]:
+        """Block until the log grows (or timeout), then read the new content.
+
+        While idle only the file size is checked, so a quiet session costs one
+        stat() per interval instead of an open/read/close.
+
+        Args:
+            timeout: Maximum seconds to wait for new content
+            poll_interval: Seconds between size checks
+
+        Returns:
+            Tuple of (new_content, has_more), same as get_updates();
+            ("", False) if nothing arrived before the timeout
+
+        Raises:
+            FileNotFoundError: If log file doesn't exist
+            PermissionError: If log file is not readable
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                size = os.stat(self.session.log_file).st_size
+            except OSError:
+                # Let get_updates report the error and update session state
+                return self.get_updates()
+
+            if size > self.session.file_position:
+                return self.get_updates()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return "", False
+            time.sleep(min(poll_interval, remaining))
+
     def get_session_duration(self) -> float:
         """Get session duration in seconds.
 
@@ -69,8 +110,6 @@ class SessionMonitor:
         Returns:
             Dictionary with session statistics
         """
-        import os
-
         self.session.state = SessionState.STOPPED
         duration = self.get_session_duration()
 
@@ -81,10 +120,16 @@ class SessionMonitor:
             "session_duration_seconds": duration,
         }
 
+        # Release the descriptor kept open for incremental reads
+        self._close_log()
+
         # Clean up log file if requested
-        if not save_log and os.path.exists(self.session.log_file):
+        if not save_log:
             try:
                 os.remove(self.session.log_file)
+            except FileNotFoundError:
+                # Already gone, nothing to clean up
+                pass
             except OSError:
                 # File might be in use, skip cleanup
                 pass
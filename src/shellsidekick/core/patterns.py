@@ -1,18 +1,73 @@
 """Pattern learning logic for prompt-response tracking."""
 
+import atexit
 import hashlib
+import heapq
+import itertools
+import logging
+import sys
+import threading
+import time
 import uuid
+import weakref
+from bisect import bisect_right
+from collections import defaultdict, deque
 from datetime import datetime
-from typing import Dict, List
-
-from shellsidekick.core.storage import load_patterns, save_patterns
+from functools import lru_cache, partial
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from shellsidekick.core.storage import (
+    append_session_history,
+    load_patterns,
+    save_patterns,
+)
 from shellsidekick.models.input_event import InputEvent, InputSource
-from shellsidekick.models.pattern import Pattern, ResponseStats
+from shellsidekick.models.pattern import Pattern
 from shellsidekick.utils.logging import get_logger
 from shellsidekick.utils.security import is_password_prompt
 
 logger = get_logger(__name__)
 
+# Pattern updates are persisted in batches: a save happens at once if none
+# happened in the last SAVE_INTERVAL_SECONDS, otherwise it is deferred until the
+# interval elapses or SAVE_BATCH_SIZE updates have piled up
+SAVE_BATCH_SIZE = 25
+SAVE_INTERVAL_SECONDS = 5.0
+
+# Each session keeps its latest MAX_EVENTS_PER_SESSION events in memory; older
+# events are appended to the session's history file, EVENT_SPILL_BATCH_SIZE at
+# a time
+MAX_EVENTS_PER_SESSION = 10_000
+EVENT_SPILL_BATCH_SIZE = 500
+
+# Event IDs: a random per-process prefix plus a counter, unique without paying
+# for a uuid4() per event; the fixed-width counter keeps them in creation order
+_EVENT_ID_PREFIX = uuid.uuid4().hex[:12]
+_event_counter = itertools.count()
+
+# Learners with possibly unsaved updates, flushed once at interpreter exit
+_live_learners: "weakref.WeakSet[PatternLearner]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_learners() -> None:
+    """Persist pending pattern updates and evicted events of every live learner."""
+    for learner in list(_live_learners):
+        learner.flush()
+
+
+@lru_cache(maxsize=4096)
+def _pattern_id_for(prompt_text: str) -> str:
+    """Hash normalized prompt text into a pattern ID (memoized per raw prompt)."""
+    # Normalize prompt text (lowercase, strip whitespace)
+    normalized = prompt_text.lower().strip()
+
+    # Generate hash (non-cryptographic use; 8-byte digest = 16 hex chars)
+    hash_obj = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8)
+    return hash_obj.hexdigest()
+
 
 class PatternLearner:
     """Learns and manages prompt-response patterns from user interactions."""
@@ -23,9 +78,29 @@ class PatternLearner:
         Args:
             auto_load: If True, load patterns from storage on init (default: True)
         """
-        self._events: Dict[str, List[InputEvent]] = {}  # session_id → events
+        # session_id → most recent events (ring buffer)
+        self._events: Dict[str, Deque[InputEvent]] = defaultdict(
+            partial(deque, maxlen=MAX_EVENTS_PER_SESSION)
+        )
+        # session_id → events pushed out of the ring buffer, not yet on disk
+        self._evicted: Dict[str, List[InputEvent]] = defaultdict(list)
         self._patterns: Dict[str, Pattern] = {}  # pattern_id → pattern
 
+        # Lowercased prompts of all patterns joined by "\0" for prompt_filter
+        # lookups; rebuilt lazily after patterns are added (see _prompt_index)
+        self._prompt_haystack: Optional[str] = None
+        self._prompt_starts: List[int] = []
+        self._prompt_patterns: List[Pattern] = []
+
+        # Deferred-save bookkeeping (see SAVE_BATCH_SIZE / SAVE_INTERVAL_SECONDS)
+        self._lock = threading.RLock()
+        self._dirty_count = 0
+        self._last_save = float("-inf")
+        self._flush_timer: Optional[threading.Timer] = None
+        # Pattern updates counted while track_input_events runs (None otherwise)
+        self._deferred_updates: Optional[int] = None
+        _live_learners.add(self)
+
         # Load existing patterns from storage
         if auto_load:
             self.load_from_storage()
@@ -53,19 +128,29 @@ class PatternLearner:
             Dictionary with event_id, recorded, and pattern_updated status
         """
         # Generate event ID
-        event_id = str(uuid.uuid4())
+        event_id = f"{_EVENT_ID_PREFIX}-{next(_event_counter):012x}"
+
+        # Recurring prompts, answers and session IDs share one string object
+        # across events and patterns
+        prompt_text = sys.intern(prompt_text)
+        session_id = sys.intern(session_id)
 
         # Check if password and redact if needed
         is_password = is_password_prompt(prompt_text)
         if is_password:
             input_text = "[REDACTED]"
-            logger.info(f"Password prompt detected in session {session_id}, input redacted")
+            logger.info("Password prompt detected in session %s, input redacted", session_id)
+        else:
+            input_text = sys.intern(input_text)
+
+        # One clock read serves the event and the pattern timestamps
+        now = datetime.now()
 
         # Create event
         event = InputEvent(
             event_id=event_id,
             session_id=session_id,
-            timestamp=datetime.now(),
+            timestamp=now,
             prompt_text=prompt_text,
             input_text=input_text,
             success=success,
@@ -73,101 +158,200 @@ class PatternLearner:
             response_time_ms=response_time_ms,
         )
 
-        # Store event
-        if session_id not in self._events:
-            self._events[session_id] = []
-        self._events[session_id].append(event)
+        # Store event, spilling the oldest one to disk once the buffer is full
+        with self._lock:
+            events = self._events[session_id]
+            if len(events) == events.maxlen:
+                self._spill_event(events[0])
+            events.append(event)
 
         # Update patterns (not for passwords - always track success/failure for patterns)
         pattern_updated = False
         if not is_password:
-            pattern_updated = self._update_pattern(prompt_text, input_text, success)
+            pattern_updated = self._update_pattern(prompt_text, input_text, success, now)
 
+        # Lazy %-formatting: nothing is built unless the record is emitted
         logger.info(
-            f"Tracked input event {event_id} for session {session_id}: "
-            f"prompt='{prompt_text[:50]}...', success={success}, "
-            f"pattern_updated={pattern_updated}"
+            "Tracked input event %s for session %s: prompt='%.50s...', success=%s, "
+            "pattern_updated=%s",
+            event_id,
+            session_id,
+            prompt_text,
+            success,
+            pattern_updated,
         )
 
         return {"event_id": event_id, "recorded": True, "pattern_updated": pattern_updated}
 
-    def _update_pattern(self, prompt_text: str, input_text: str, success: bool) -> bool:
+    def track_input_events(self, events: Iterable[Mapping[str, Any]]) -> List[dict]:
+        """Track several input events in one call.
+
+        Same as calling track_input_event for each event in order, except that
+        the save policy is applied once for the whole batch: a batch of any
+        size triggers at most one pattern save, not one per SAVE_BATCH_SIZE
+        events.
+
+        Args:
+            events: Mappings of track_input_event keyword arguments
+
+        Returns:
+            List of track_input_event results, in input order
+        """
+        with self._lock:
+            self._deferred_updates = 0
+            try:
+                return [self.track_input_event(**event) for event in events]
+            finally:
+                updates, self._deferred_updates = self._deferred_updates, None
+                if updates:
+                    self._schedule_save(updates)
+
+    def _update_pattern(
+        self, prompt_text: str, input_text: str, success: bool, now: Optional[datetime] = None
+    ) -> bool:
         """Update learned pattern with new prompt-response pair.
 
         Args:
             prompt_text: The prompt text
             input_text: The response text
             success: Whether response was successful
+            now: Time of the event (defaults to the current time)
 
         Returns:
             True if pattern was updated
         """
-        # Generate pattern ID from prompt text
-        pattern_id = self._generate_pattern_id(prompt_text)
-
-        # Get or create pattern
-        if pattern_id not in self._patterns:
-            self._patterns[pattern_id] = Pattern(
-                pattern_id=pattern_id,
-                prompt_text=prompt_text,
-                responses={},
-                total_occurrences=0,
-                last_seen=datetime.now(),
-                created_at=datetime.now(),
-            )
-            logger.debug(f"Created new pattern {pattern_id} for prompt: '{prompt_text[:50]}...'")
-
-        pattern = self._patterns[pattern_id]
-
-        # Update response statistics
-        if input_text not in pattern.responses:
-            pattern.responses[input_text] = ResponseStats(count=0, success_count=0)
+        if now is None:
+            now = datetime.now()
+
+        with self._lock:
+            # Generate pattern ID from prompt text
+            pattern_id = self._generate_pattern_id(prompt_text)
+
+            # Get or create pattern
+            pattern = self._patterns.get(pattern_id)
+            if pattern is None:
+                pattern = self._patterns[pattern_id] = Pattern(
+                    pattern_id=pattern_id,
+                    prompt_text=prompt_text,
+                    responses={},
+                    total_occurrences=0,
+                    last_seen=now,
+                    created_at=now,
+                )
+                self._prompt_haystack = None
+                logger.debug(
+                    "Created new pattern %s for prompt: '%.50s...'", pattern_id, prompt_text
+                )
+
+            # Update response statistics and pattern metadata
+            pattern.record_response(input_text, success, now)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                stats = pattern.responses[input_text]
+                logger.debug(
+                    "Updated pattern %s: response '%s' now has %d occurrences, %d successful",
+                    pattern_id,
+                    input_text,
+                    stats.count,
+                    stats.success_count,
+                )
+
+            # Persist patterns to storage (batched); track_input_events applies
+            # the save policy once for its whole batch
+            if self._deferred_updates is None:
+                self._schedule_save()
+            else:
+                self._deferred_updates += 1
 
-        pattern.responses[input_text].count += 1
-        if success:
-            pattern.responses[input_text].success_count += 1
+        return True
 
-        # Update pattern metadata
-        pattern.total_occurrences += 1
-        pattern.last_seen = datetime.now()
+    def _schedule_save(self, count: int = 1) -> None:
+        """Record pending updates and save now or later per the batching policy."""
+        with self._lock:
+            self._dirty_count += count
+            elapsed = time.monotonic() - self._last_save
+            if self._dirty_count >= SAVE_BATCH_SIZE or elapsed >= SAVE_INTERVAL_SECONDS:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(SAVE_INTERVAL_SECONDS - elapsed, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self) -> bool:
+        """Save pending pattern updates and evicted events to storage, if there are any.
 
-        logger.debug(
-            f"Updated pattern {pattern_id}: response '{input_text}' now has "
-            f"{pattern.responses[input_text].count} occurrences, "
-            f"{pattern.responses[input_text].success_count} successful"
-        )
+        Returns:
+            True if nothing was pending or every save succeeded, False otherwise
+        """
+        with self._lock:
+            events_saved = all([self._save_evicted(sid) for sid in list(self._evicted)])
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._dirty_count == 0:
+                return events_saved
+            return self.save_to_storage() and events_saved
+
+    def _spill_event(self, event: InputEvent) -> None:
+        """Queue an event leaving the in-memory buffer for the session history file."""
+        with self._lock:
+            evicted = self._evicted[event.session_id]
+            evicted.append(event)
+            if len(evicted) >= EVENT_SPILL_BATCH_SIZE:
+                self._save_evicted(event.session_id)
+
+    def _save_evicted(self, session_id: str) -> bool:
+        """Append a session's evicted events to its history file.
 
-        # Persist patterns to storage
-        self.save_to_storage()
+        Args:
+            session_id: Session identifier
 
-        return True
+        Returns:
+            True if save succeeded, False otherwise
+        """
+        with self._lock:
+            evicted = self._evicted.pop(session_id, None)
+            if not evicted:
+                return True
+            try:
+                append_session_history(session_id, [e.to_dict() for e in evicted])
+                logger.debug("Spilled %d events of session %s to history", len(evicted), session_id)
+                return True
+
+            except Exception as e:
+                # Put the batch back in front of anything queued since, so the
+                # next flush retries it in order
+                self._evicted[session_id][:0] = evicted
+                logger.error("Failed to save history for session %s: %s", session_id, e)
+                return False
 
     def _generate_pattern_id(self, prompt_text: str) -> str:
         """Generate a consistent pattern ID from prompt text.
 
+        Recurring prompts are served from a module-level LRU cache, skipping
+        both normalization and hashing.
+
         Args:
             prompt_text: The prompt text to hash
 
         Returns:
-            SHA256 hash of the prompt text (first 16 chars)
+            BLAKE2b hash of the normalized prompt text (16 hex chars)
         """
-        # Normalize prompt text (lowercase, strip whitespace)
-        normalized = prompt_text.lower().strip()
-
-        # Generate hash
-        hash_obj = hashlib.sha256(normalized.encode("utf-8"))
-        return hash_obj.hexdigest()[:16]
+        return _pattern_id_for(prompt_text)
 
     def get_session_events(self, session_id: str) -> List[InputEvent]:
-        """Get all tracked events for a session.
+        """Get the tracked events still held in memory for a session.
+
+        At most MAX_EVENTS_PER_SESSION of the most recent events are kept;
+        older ones are in the session history file.
 
         Args:
             session_id: Session identifier
 
         Returns:
-            List of InputEvent objects (may be empty)
+            List of InputEvent objects, oldest first (may be empty)
         """
-        return self._events.get(session_id, [])
+        return list(self._events.get(session_id, ()))
 
     def get_patterns(self) -> List[Pattern]:
         """Get all learned patterns.
@@ -194,6 +378,7 @@ class PatternLearner:
         prompt_filter: str | None = None,
         min_occurrences: int = 1,
         sort_by: str = "occurrences",
+        limit: int | None = None,
     ) -> dict:
         """Get learned patterns with filtering and sorting.
 
@@ -201,37 +386,56 @@ class PatternLearner:
             prompt_filter: Optional substring filter for prompt text
             min_occurrences: Minimum number of occurrences (default: 1)
             sort_by: Sort field - "occurrences", "last_seen", or "success_rate"
+            limit: Optional maximum number of (top-sorted) patterns to return
 
         Returns:
             Dictionary with patterns array and total_patterns count
         """
-        # Start with all patterns
-        patterns = list(self._patterns.values())
-
-        # Apply prompt filter
-        if prompt_filter:
-            patterns = [p for p in patterns if prompt_filter.lower() in p.prompt_text.lower()]
-
-        # Apply min_occurrences filter
-        patterns = [p for p in patterns if p.total_occurrences >= min_occurrences]
-
         # Sort patterns
         if sort_by == "occurrences":
-            patterns.sort(key=lambda p: p.total_occurrences, reverse=True)
+            sort_key = attrgetter("total_occurrences")
         elif sort_by == "last_seen":
-            patterns.sort(key=lambda p: p.last_seen, reverse=True)
+            sort_key = attrgetter("last_seen")
         elif sort_by == "success_rate":
             # Sort by success rate of most common response
-            def get_success_rate(pattern: Pattern) -> float:
+            def sort_key(pattern: Pattern) -> float:
                 mcr = pattern.get_most_common_response()
                 return mcr[1].success_rate if mcr else 0.0
 
-            patterns.sort(key=get_success_rate, reverse=True)
+        else:
+            sort_key = None
+
+        with self._lock:
+            # Apply prompt filter
+            if not prompt_filter:
+                candidates = self._patterns.values()
+            elif "\0" in prompt_filter:
+                # Could match across the index separator; scan patterns directly
+                prompt_filter = prompt_filter.lower()
+                candidates = (
+                    p for p in self._patterns.values() if prompt_filter in p.prompt_text.lower()
+                )
+            else:
+                candidates = self._patterns_matching(prompt_filter.lower())
+
+            # Filter lazily so no intermediate lists are built before selection
+            patterns = (p for p in candidates if p.total_occurrences >= min_occurrences)
+
+            if limit is not None:
+                # Top-K selection is O(n log k) and matches sort-then-slice order
+                if sort_key is not None:
+                    patterns = heapq.nlargest(limit, patterns, key=sort_key)
+                else:
+                    patterns = list(islice(patterns, limit))
+            elif sort_key is not None:
+                patterns = sorted(patterns, key=sort_key, reverse=True)
+            else:
+                patterns = list(patterns)
 
         # Format patterns for output
         formatted_patterns = []
         for pattern in patterns:
-            # Get most common response
+            # Get most common response (tracked by the response table, O(1))
             mcr_tuple = pattern.get_most_common_response()
             if mcr_tuple:
                 mcr_text, mcr_stats = mcr_tuple
@@ -247,11 +451,11 @@ class PatternLearner:
             all_responses = [
                 {
                     "input_text": text,
-                    "count": stats.count,
-                    "success_count": stats.success_count,
-                    "success_rate": stats.success_rate,
+                    "count": count,
+                    "success_count": success_count,
+                    "success_rate": success_count / count if count > 0 else 0.0,
                 }
-                for text, stats in pattern.responses.items()
+                for text, count, success_count in pattern.responses.rows()
             ]
 
             formatted_patterns.append(
@@ -260,12 +464,36 @@ class PatternLearner:
                     "total_occurrences": pattern.total_occurrences,
                     "most_common_response": most_common_response,
                     "all_responses": all_responses,
-                    "last_seen": pattern.last_seen.isoformat(),
+                    "last_seen": pattern.last_seen_iso,
                 }
             )
 
         return {"patterns": formatted_patterns, "total_patterns": len(formatted_patterns)}
 
+    def _patterns_matching(self, needle: str) -> Iterator[Pattern]:
+        """Yield patterns whose lowercased prompt contains needle, in insertion order.
+
+        One str.find over the joined prompt index replaces a lower() and a
+        containment test per pattern; bisecting the start offsets maps each
+        hit back to its pattern. Must be called with the lock held.
+        """
+        if self._prompt_haystack is None:
+            self._prompt_patterns = list(self._patterns.values())
+            lowered = [p.prompt_text.lower() for p in self._prompt_patterns]
+            self._prompt_starts = list(
+                itertools.accumulate((len(t) + 1 for t in lowered), initial=0)
+            )
+            self._prompt_haystack = "\0".join(lowered)
+
+        haystack = self._prompt_haystack
+        starts = self._prompt_starts
+        pos = haystack.find(needle)
+        while pos != -1:
+            i = bisect_right(starts, pos) - 1
+            yield self._prompt_patterns[i]
+            # Resume at the next prompt: each pattern is reported once
+            pos = haystack.find(needle, starts[i + 1])
+
     def load_from_storage(self) -> int:
         """Load patterns from JSON storage.
 
@@ -273,13 +501,17 @@ class PatternLearner:
             Number of patterns loaded
         """
         try:
-            pattern_dicts = load_patterns()
-            loaded_count = 0
+            patterns = [Pattern.from_dict(d) for d in load_patterns()]
+            loaded_count = len(patterns)
+
+            # Re-key patterns saved under an older ID scheme (SHA256 prefix)
+            for pattern in patterns:
+                pattern.pattern_id = self._generate_pattern_id(pattern.prompt_text)
 
-            for pattern_dict in pattern_dicts:
-                pattern = Pattern.from_dict(pattern_dict)
-                self._patterns[pattern.pattern_id] = pattern
-                loaded_count += 1
+            # Merge in one C-level update, only once every record has parsed
+            with self._lock:
+                self._patterns.update((p.pattern_id, p) for p in patterns)
+                self._prompt_haystack = None
 
             if loaded_count > 0:
                 logger.info(f"Loaded {loaded_count} patterns from storage")
@@ -299,8 +531,12 @@ class PatternLearner:
             True if save succeeded, False otherwise
         """
         try:
-            pattern_dicts = [p.to_dict() for p in self._patterns.values()]
-            save_patterns(pattern_dicts)
+            with self._lock:
+                # save_patterns only serializes, so the memoized dicts are not copied
+                pattern_dicts = [p._serialized() for p in self._patterns.values()]
+                save_patterns(pattern_dicts)
+                self._dirty_count = 0
+                self._last_save = time.monotonic()
             logger.debug(f"Saved {len(pattern_dicts)} patterns to storage")
             return True
 
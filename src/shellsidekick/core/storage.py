@@ -1,16 +1,39 @@
 """JSON storage utilities for session history and patterns."""
 
+import hashlib
 import json
+import mmap
 import os
 import re
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterator, List
 
 # Base storage directory
 STORAGE_DIR = Path("/tmp/ssk-sessions")
 HISTORY_DIR = STORAGE_DIR / "history"
 PATTERNS_FILE = STORAGE_DIR / "patterns.json"
 
+# Any of these makes a search query a regex; without them it is a plain substring.
+# Line breaks also force the line-by-line path, since a raw byte scan would
+# match across lines
+_REGEX_METACHARS_RE = re.compile(r"[.^$*+?{}\[\]\\|()\n\r]")
+
+# Threads used to delete expired files (os.remove releases the GIL)
+CLEANUP_WORKERS = 8
+
+# Indent saved JSON for human inspection; files are compact unless this is set
+PRETTY_JSON = os.environ.get("SSK_PRETTY_JSON", "").lower() in ("1", "true", "yes")
+
+# Digest and (mtime, size) of the last document written to each path, to skip
+# rewriting identical content that is still on disk untouched
+_last_written: Dict[Path, tuple[bytes, tuple[int, int]]] = {}
+
 
 def init_storage() -> None:
     """Initialize storage directories with secure permissions."""
@@ -21,17 +44,51 @@ def init_storage() -> None:
 def save_json(file_path: Path, data: Dict[str, Any]) -> None:
     """Save data to JSON file with secure permissions.
 
+    The document is written to a temporary file in the same directory and
+    swapped into place with os.replace, so a crash never leaves a truncated
+    file behind. Saving a document identical to the last one written to the
+    same path is skipped. Output is compact JSON unless SSK_PRETTY_JSON is set.
+
     Args:
         file_path: Path to JSON file
         data: Data to save
     """
-    file_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if PRETTY_JSON:
+        text = json.dumps(data, indent=2, default=str)
+    else:
+        text = json.dumps(data, separators=(",", ":"), default=str)
+    payload = text.encode("utf-8")
+    digest = hashlib.blake2b(payload, digest_size=16).digest()
+    last = _last_written.get(file_path)
+    if last is not None and last[0] == digest:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            pass
+        else:
+            if (st.st_mtime_ns, st.st_size) == last[1]:
+                return
 
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=2, default=str)
+    file_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
 
-    # Set secure permissions (user-only read/write)
-    os.chmod(file_path, 0o600)
+    # mkstemp creates the file with secure permissions (user-only read/write)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            st = os.fstat(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    _last_written[file_path] = (digest, (st.st_mtime_ns, st.st_size))
 
 
 def load_json(file_path: Path) -> Dict[str, Any]:
@@ -43,11 +100,15 @@ def load_json(file_path: Path) -> Dict[str, Any]:
     Returns:
         Loaded data, or empty dict if file doesn't exist
     """
-    if not file_path.exists():
+    # One binary read handed straight to the C decoder; a missing file is
+    # detected by open() itself rather than a separate exists() stat
+    try:
+        with open(file_path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
         return {}
 
-    with open(file_path, "r") as f:
-        return json.load(f)
+    return json.loads(raw)
 
 
 def get_session_history_path(session_id: str) -> Path:
@@ -62,8 +123,13 @@ def get_session_history_path(session_id: str) -> Path:
     return HISTORY_DIR / f"{session_id}.json"
 
 
+def _session_history_log_path(session_id: str) -> Path:
+    """Path of the append-only log holding events added by append_session_history."""
+    return HISTORY_DIR / f"{session_id}.jsonl"
+
+
 def save_session_history(session_id: str, events: List[Dict[str, Any]]) -> None:
-    """Save session input history.
+    """Save session input history, replacing any existing history.
 
     Args:
         session_id: Session identifier
@@ -72,6 +138,38 @@ def save_session_history(session_id: str, events: List[Dict[str, Any]]) -> None:
     history_path = get_session_history_path(session_id)
     data = {"session_id": session_id, "events": events}
     save_json(history_path, data)
+    try:
+        os.remove(_session_history_log_path(session_id))
+    except FileNotFoundError:
+        pass
+
+
+def append_session_history(session_id: str, events: List[Dict[str, Any]]) -> None:
+    """Append events to session input history without rewriting it.
+
+    Events go to a JSON-lines log next to the history file, written with a
+    single O_APPEND write, so the cost depends only on the new events.
+
+    Args:
+        session_id: Session identifier
+        events: List of input events
+    """
+    if not events:
+        return
+    log_path = _session_history_log_path(session_id)
+    log_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    payload = "".join(
+        json.dumps(event, separators=(",", ":"), default=str) + "\n" for event in events
+    ).encode("utf-8")
+    fd = os.open(log_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+    try:
+        # Start on a fresh line if an earlier append was cut short
+        size = os.fstat(fd).st_size
+        if size and os.pread(fd, 1, size - 1) != b"\n":
+            payload = b"\n" + payload
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
 
 
 def load_session_history(session_id: str) -> List[Dict[str, Any]]:
@@ -81,11 +179,26 @@ def load_session_history(session_id: str) -> List[Dict[str, Any]]:
         session_id: Session identifier
 
     Returns:
-        List of input events, empty if no history exists
+        List of input events (saved history, then appended events), empty if
+        no history exists
     """
     history_path = get_session_history_path(session_id)
-    data = load_json(history_path)
-    return data.get("events", [])
+    events = load_json(history_path).get("events", [])
+
+    try:
+        with open(_session_history_log_path(session_id), "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return events
+
+    # Lines cut short by an interrupted append don't decode; skip them
+    for line in raw.split(b"\n"):
+        if line:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return events
 
 
 def save_patterns(patterns: List[Dict[str, Any]]) -> None:
@@ -108,6 +221,24 @@ def load_patterns() -> List[Dict[str, Any]]:
     return data.get("patterns", [])
 
 
+def _remove_files(paths: List[str], dir_fd: int | None = None) -> None:
+    """Delete files concurrently; errors propagate like a plain os.remove loop.
+
+    Args:
+        paths: Files to delete
+        dir_fd: Open directory the paths are relative to (unlinkat), so each
+            removal skips resolving the directory path again
+    """
+    remove = partial(os.remove, dir_fd=dir_fd)
+    if len(paths) <= 1:
+        for path in paths:
+            remove(path)
+        return
+    with ThreadPoolExecutor(max_workers=min(CLEANUP_WORKERS, len(paths))) as pool:
+        for _ in pool.map(remove, paths):
+            pass
+
+
 def cleanup_old_files(retention_days: int = 7, dry_run: bool = False) -> tuple[List[str], int]:
     """Clean up files older than retention period.
 
@@ -118,31 +249,56 @@ def cleanup_old_files(retention_days: int = 7, dry_run: bool = False) -> tuple[L
     Returns:
         Tuple of (deleted_files, bytes_freed)
     """
-    import time
-
     cutoff_time = time.time() - (retention_days * 24 * 60 * 60)
     deleted_files = []
     bytes_freed = 0
+    patterns_path = str(PATTERNS_FILE)
+
+    # Scan all files in storage directory; DirEntry caches type info from the
+    # directory read, and one stat() per file serves both mtime and size
+    pending = [str(STORAGE_DIR)]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        pending.append(entry.path)
+                    continue
+
+                # Skip patterns file (global, not session-specific)
+                if entry.path == patterns_path:
+                    continue
+
+                # Check file age
+                st = entry.stat()
+                if st.st_mtime < cutoff_time:
+                    deleted_files.append(entry.path)
+                    bytes_freed += st.st_size
+
+    if not dry_run:
+        _remove_files(deleted_files)
 
-    # Scan all files in storage directory
-    for root, dirs, files in os.walk(STORAGE_DIR):
-        for filename in files:
-            file_path = Path(root) / filename
+    return deleted_files, bytes_freed
 
-            # Skip patterns file (global, not session-specific)
-            if file_path == PATTERNS_FILE:
-                continue
 
-            # Check file age
-            if os.path.getmtime(file_path) < cutoff_time:
-                file_size = os.path.getsize(file_path)
-                deleted_files.append(str(file_path))
-                bytes_freed += file_size
+@lru_cache(maxsize=128)
+def compile_search_pattern(query: str) -> re.Pattern:
+    """Compile a search query once, shared by validation and every searched log.
 
-                if not dry_run:
-                    os.remove(file_path)
+    Args:
+        query: Search query (supports regex)
 
-    return deleted_files, bytes_freed
+    Returns:
+        Compiled pattern
+
+    Raises:
+        re.error: If query is invalid regex pattern
+    """
+    return re.compile(query)
 
 
 def search_log_file(
@@ -166,44 +322,116 @@ def search_log_file(
     Raises:
         re.error: If query is invalid regex pattern
     """
-    # Compile regex pattern (raises re.error if invalid)
-    pattern = re.compile(query)
+    if query and _REGEX_METACHARS_RE.search(query) is None:
+        # Plain substring: scan the raw bytes, decoding only matching lines
+        matches = _iter_literal_matches(log_file, query, context_lines)
+    else:
+        # Compile regex pattern (raises re.error if invalid)
+        matches = _iter_log_matches(log_file, compile_search_pattern(query).search, context_lines)
+
+    return list(islice(matches, max_results))
+
 
-    results = []
-    lines = []
+def _decode_line(raw: bytes) -> str:
+    return raw.decode("utf-8", errors="replace")
 
-    # Read all lines from file
-    with open(log_file, "r") as f:
-        lines = f.readlines()
 
-    # Strip newlines
-    lines = [line.rstrip("\n") for line in lines]
+def _iter_literal_matches(
+    log_file: str, query: str, context_lines: int
+) -> Iterator[Dict[str, Any]]:
+    """Stream lines containing a plain substring, scanning the mmap'd file bytes.
 
-    # Search for matches
-    for i, line in enumerate(lines):
-        if pattern.search(line):
-            # Extract context
-            start_idx = max(0, i - context_lines)
-            end_idx = min(len(lines), i + context_lines + 1)
+    The UTF-8 encoded query is located with mmap.find (a C-level scan), and
+    line boundaries, line numbers and context are found by searching for
+    b"\n" around it. Only matched lines and their context are decoded. Files with
+    \r line endings take the line-by-line path, which applies universal
+    newlines.
+    """
+    with open(log_file, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b"\r") != -1:
+                yield from _iter_log_matches(log_file, lambda line: query in line, context_lines)
+                return
+
+            needle = query.encode("utf-8")
+            line_number = 1
+            counted_to = 0
+            pos = mm.find(needle)
+            while pos != -1:
+                start = mm.rfind(b"\n", 0, pos) + 1
+                end = mm.find(b"\n", pos)
+                if end == -1:
+                    end = size
+                line_number += mm[counted_to:start].count(b"\n")
+                counted_to = start
+
+                context_before = []
+                line_start = start
+                while len(context_before) < context_lines and line_start > 0:
+                    prev_start = mm.rfind(b"\n", 0, line_start - 1) + 1
+                    context_before.append(_decode_line(mm[prev_start : line_start - 1]))
+                    line_start = prev_start
+                context_before.reverse()
+
+                context_after = []
+                line_end = end
+                while len(context_after) < context_lines and line_end + 1 < size:
+                    next_end = mm.find(b"\n", line_end + 1)
+                    if next_end == -1:
+                        next_end = size
+                    context_after.append(_decode_line(mm[line_end + 1 : next_end]))
+                    line_end = next_end
+
+                yield {
+                    "matched_text": _decode_line(mm[start:end]),
+                    "line_number": line_number,  # 1-indexed
+                    "context_before": context_before,
+                    "context_after": context_after,
+                }
+
+                # One result per line: resume on the next line
+                pos = mm.find(needle, end + 1) if end + 1 < size else -1
+
+
+def _iter_log_matches(
+    log_file: str, is_match: Callable[[str], Any], context_lines: int
+) -> Iterator[Dict[str, Any]]:
+    """Stream matches from a log file in line order.
+
+    Lines are read one at a time, so memory stays bounded by the context
+    window instead of the file size. A match is yielded once its trailing
+    context lines have been read (or the file ended).
+    """
+    context_before: deque = deque(maxlen=context_lines)
+    pending: deque = deque()  # matches still collecting context_after
 
-            context_before = lines[start_idx:i]
-            context_after = lines[i + 1 : end_idx]
+    with open(log_file, "r", encoding="utf-8", errors="replace") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.rstrip("\n")
 
-            # Create match result
-            match = {
-                "matched_text": line,
-                "line_number": i + 1,  # 1-indexed
-                "context_before": context_before,
-                "context_after": context_after,
-            }
+            for match in pending:
+                match["context_after"].append(line)
+            while pending and len(pending[0]["context_after"]) >= context_lines:
+                yield pending.popleft()
 
-            results.append(match)
+            if is_match(line):
+                match = {
+                    "matched_text": line,
+                    "line_number": line_number,  # 1-indexed
+                    "context_before": list(context_before),
+                    "context_after": [],
+                }
+                if context_lines:
+                    pending.append(match)
+                else:
+                    yield match
 
-            # Check max results limit
-            if len(results) >= max_results:
-                break
+            context_before.append(line)
 
-    return results
+    yield from pending
 
 
 def cleanup_old_sessions(
@@ -223,32 +451,35 @@ def cleanup_old_sessions(
         - bytes_freed: Total bytes freed
         - dry_run: Whether this was a dry run
     """
-    import time
-
     # Calculate cutoff time
     cutoff_time = time.time() - (retention_days * 24 * 60 * 60)
 
     deleted_sessions = []
     bytes_freed = 0
 
-    # Scan directory for files
-    sessions_path = Path(sessions_dir)
-    if not sessions_path.exists():
+    # Scan directory for files (one stat per file for both mtime and size)
+    try:
+        entries = os.scandir(sessions_dir)
+    except FileNotFoundError:
         return {"deleted_sessions": [], "total_deleted": 0, "bytes_freed": 0, "dry_run": dry_run}
 
-    for file_path in sessions_path.iterdir():
-        if file_path.is_file():
-            # Check if file is older than cutoff
-            file_mtime = os.path.getmtime(file_path)
-
-            # Only delete if STRICTLY older (not equal)
-            if file_mtime < cutoff_time:
-                file_size = os.path.getsize(file_path)
-                deleted_sessions.append(file_path.name)
-                bytes_freed += file_size
-
-                if not dry_run:
-                    os.remove(file_path)
+    with entries:
+        for entry in entries:
+            if entry.is_file():
+                st = entry.stat()
+
+                # Only delete if STRICTLY older (not equal)
+                if st.st_mtime < cutoff_time:
+                    deleted_sessions.append(entry.name)
+                    bytes_freed += st.st_size
+
+    if not dry_run and deleted_sessions:
+        # Unlink by name relative to the directory fd
+        dir_fd = os.open(sessions_dir, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            _remove_files(deleted_sessions, dir_fd=dir_fd)
+        finally:
+            os.close(dir_fd)
 
     return {
         "deleted_sessions": deleted_sessions,
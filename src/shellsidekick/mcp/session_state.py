@@ -1,6 +1,7 @@
 """Shared session state to avoid circular imports."""
 
-from typing import TYPE_CHECKING, Dict
+import threading
+from typing import TYPE_CHECKING, Dict, Optional
 
 from shellsidekick.core.patterns import PatternLearner
 
@@ -12,5 +13,32 @@ if TYPE_CHECKING:
 # to avoid circular import issues
 active_sessions: Dict[str, "SessionMonitor"] = {}
 
-# Global pattern learner for all sessions
-pattern_learner = PatternLearner()
+# Global pattern learner for all sessions, created on first use so that
+# loading stored patterns does not delay server startup
+_pattern_learner: Optional[PatternLearner] = None
+_pattern_learner_lock = threading.Lock()
+
+
+def get_pattern_learner() -> PatternLearner:
+    """Get the global pattern learner, loading stored patterns on first call.
+
+    Returns:
+        Shared PatternLearner instance
+    """
+    global _pattern_learner
+    if _pattern_learner is None:
+        with _pattern_learner_lock:
+            if _pattern_learner is None:
+                _pattern_learner = PatternLearner()
+    return _pattern_learner
+
+
+def flush_pattern_learner() -> None:
+    """Flush pending pattern and history writes, if the learner was ever created.
+
+    Unlike get_pattern_learner(), this never creates the learner, so callers
+    that only want to persist state do not trigger loading stored patterns.
+    """
+    learner = _pattern_learner
+    if learner is not None:
+        learner.flush()
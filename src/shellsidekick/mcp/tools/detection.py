@@ -7,7 +7,7 @@ from fastmcp.exceptions import ToolError
 from shellsidekick.core.detector import PromptDetector
 from shellsidekick.core.inference import InputInferenceEngine
 from shellsidekick.mcp.server import mcp
-from shellsidekick.mcp.session_state import active_sessions, pattern_learner
+from shellsidekick.mcp.session_state import active_sessions, get_pattern_learner
 from shellsidekick.models.prompt import PromptType
 from shellsidekick.utils.logging import get_logger
 
@@ -54,8 +54,10 @@ def detect_input_prompt(session_id: str, min_confidence: float = 0.70) -> dict:
 
     if detection:
         logger.info(
-            f"Detected {detection.prompt_type.value} prompt in session {session_id} "
-            f"(confidence: {detection.confidence:.2f})"
+            "Detected %s prompt in session %s (confidence: %.2f)",
+            detection.prompt_type.value,
+            session_id,
+            detection.confidence,
         )
 
         return {"detected": True, "prompt": detection.to_dict()}
@@ -93,7 +95,7 @@ def infer_expected_input(
         )
 
     # Initialize inference engine with pattern learning
-    engine = InputInferenceEngine(pattern_learner=pattern_learner)
+    engine = InputInferenceEngine(pattern_learner=get_pattern_learner())
 
     # Get suggestions and warnings
     suggestions, warnings = engine.infer_inputs(
@@ -101,7 +103,7 @@ def infer_expected_input(
     )
 
     logger.info(
-        f"Inferred {len(suggestions)} suggestions for {prompt_type} prompt: '{prompt_text}'"
+        "Inferred %d suggestions for %s prompt: '%s'", len(suggestions), prompt_type, prompt_text
     )
 
     if warnings:
@@ -1,16 +1,39 @@
 """MCP tools for pattern learning and history management."""
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from typing import Optional
 
 from fastmcp.exceptions import ToolError
 
 from shellsidekick.mcp.server import mcp
-from shellsidekick.mcp.session_state import pattern_learner
+from shellsidekick.mcp.session_state import get_pattern_learner
 from shellsidekick.models.input_event import InputSource
 from shellsidekick.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Accepted values and their error-message listings, built once at import
+_SORT_FIELDS = ("occurrences", "last_seen", "success_rate")
+_VALID_SORT_FIELDS = frozenset(_SORT_FIELDS)
+_SORT_FIELDS_MSG = ", ".join(_SORT_FIELDS)
+_INPUT_SOURCES_MSG = ", ".join(s.value for s in InputSource)
+
+# Session logs searched concurrently by search_session_history
+SEARCH_WORKERS = 8
+
+
+@dataclass
+class TrackInputEvent:
+    """One event passed to track_input_events (same fields as track_input_event)."""
+
+    session_id: str
+    prompt_text: str
+    input_text: str
+    success: bool
+    input_source: str
+    response_time_ms: int
+
 
 @mcp.tool()
 def track_input_event(
@@ -44,17 +67,15 @@ def track_input_event(
         ToolError: If input_source is invalid
     """
     # Validate input_source
-    try:
-        source = InputSource(input_source)
-    except ValueError:
+    source = InputSource.from_value(input_source)
+    if source is None:
         raise ToolError(
-            f"Invalid input_source: {input_source}. Must be one of: "
-            f"{', '.join([s.value for s in InputSource])}",
+            f"Invalid input_source: {input_source}. Must be one of: {_INPUT_SOURCES_MSG}",
             code="INVALID_INPUT_SOURCE",
         )
 
     # Track the event
-    result = pattern_learner.track_input_event(
+    result = get_pattern_learner().track_input_event(
         session_id=session_id,
         prompt_text=prompt_text,
         input_text=input_text,
@@ -64,16 +85,67 @@ def track_input_event(
     )
 
     logger.info(
-        f"Tracked input event for session {session_id}: "
-        f"success={success}, pattern_updated={result['pattern_updated']}"
+        "Tracked input event for session %s: success=%s, pattern_updated=%s",
+        session_id,
+        success,
+        result["pattern_updated"],
     )
 
     return result
 
 
+@mcp.tool()
+def track_input_events(events: list[TrackInputEvent]) -> dict:
+    """Track several user input events for pattern learning in one call.
+
+    Each event takes the same fields, with the same types, as
+    track_input_event. All events are validated before any is recorded, so
+    an invalid batch records nothing.
+
+    Args:
+        events: List of {session_id, prompt_text, input_text, success,
+            input_source, response_time_ms}
+
+    Returns:
+        Dictionary with:
+        - results: One track_input_event result per event, in order
+
+    Raises:
+        ToolError: If an event has missing or mistyped fields or an invalid input_source
+    """
+    batch = []
+    for idx, event in enumerate(events):
+        source = InputSource.from_value(event.input_source)
+        if source is None:
+            raise ToolError(
+                f"Invalid input_source in event {idx}: {event.input_source}. "
+                f"Must be one of: {_INPUT_SOURCES_MSG}",
+                code="INVALID_INPUT_SOURCE",
+            )
+        batch.append(
+            {
+                "session_id": event.session_id,
+                "prompt_text": event.prompt_text,
+                "input_text": event.input_text,
+                "success": event.success,
+                "input_source": source,
+                "response_time_ms": event.response_time_ms,
+            }
+        )
+
+    results = get_pattern_learner().track_input_events(batch)
+
+    logger.info("Tracked %d input events", len(results))
+
+    return {"results": results}
+
+
 @mcp.tool()
 def get_learned_patterns(
-    prompt_filter: Optional[str] = None, min_occurrences: int = 1, sort_by: str = "occurrences"
+    prompt_filter: Optional[str] = None,
+    min_occurrences: int = 1,
+    sort_by: str = "occurrences",
+    limit: Optional[int] = None,
 ) -> dict:
     """Retrieve learned prompt-response patterns.
 
@@ -85,6 +157,7 @@ def get_learned_patterns(
         prompt_filter: Optional substring filter for prompt text (case-insensitive)
         min_occurrences: Minimum number of occurrences to include (default: 1)
         sort_by: Sort field - "occurrences" (default), "last_seen", or "success_rate"
+        limit: Optional maximum number of top patterns to return (at least 1)
 
     Returns:
         Dictionary with:
@@ -97,13 +170,12 @@ def get_learned_patterns(
         - total_patterns: Total number of patterns returned
 
     Raises:
-        ToolError: If sort_by is invalid or min_occurrences is negative
+        ToolError: If sort_by is invalid, min_occurrences is negative, or limit is below 1
     """
     # Validate sort_by
-    valid_sort_fields = ["occurrences", "last_seen", "success_rate"]
-    if sort_by not in valid_sort_fields:
+    if sort_by not in _VALID_SORT_FIELDS:
         raise ToolError(
-            f"Invalid sort_by: {sort_by}. Must be one of: {', '.join(valid_sort_fields)}",
+            f"Invalid sort_by: {sort_by}. Must be one of: {_SORT_FIELDS_MSG}",
             code="INVALID_SORT_FIELD",
         )
 
@@ -111,14 +183,21 @@ def get_learned_patterns(
     if min_occurrences < 1:
         raise ToolError("min_occurrences must be at least 1", code="INVALID_MIN_OCCURRENCES")
 
+    # Validate limit
+    if limit is not None and limit < 1:
+        raise ToolError("limit must be at least 1", code="INVALID_LIMIT")
+
     # Get formatted patterns
-    result = pattern_learner.get_patterns_formatted(
-        prompt_filter=prompt_filter, min_occurrences=min_occurrences, sort_by=sort_by
+    result = get_pattern_learner().get_patterns_formatted(
+        prompt_filter=prompt_filter, min_occurrences=min_occurrences, sort_by=sort_by, limit=limit
     )
 
     logger.info(
-        f"Retrieved {result['total_patterns']} learned patterns "
-        f"(filter='{prompt_filter}', min={min_occurrences}, sort={sort_by})"
+        "Retrieved %d learned patterns (filter='%s', min=%d, sort=%s)",
+        result["total_patterns"],
+        prompt_filter,
+        min_occurrences,
+        sort_by,
     )
 
     return result
@@ -150,7 +229,7 @@ def search_session_history(
     """
     import re
 
-    from shellsidekick.core.storage import search_log_file
+    from shellsidekick.core.storage import compile_search_pattern, search_log_file
     from shellsidekick.mcp.session_state import active_sessions
 
     # Validate parameters
@@ -160,9 +239,9 @@ def search_session_history(
     if max_results < 1 or max_results > 100:
         raise ToolError("max_results must be between 1 and 100", code="INVALID_MAX_RESULTS")
 
-    # Validate regex pattern
+    # Validate regex pattern (compiled once, reused for every session searched)
     try:
-        re.compile(query)
+        compile_search_pattern(query)
     except re.error as e:
         raise ToolError(f"Invalid regex pattern: {str(e)}", code="INVALID_REGEX")
 
@@ -177,38 +256,72 @@ def search_session_history(
         # Search all active sessions
         sessions_to_search = active_sessions
 
-    # Search each session
+    # Search each session; at most SEARCH_WORKERS logs are read at once, and
+    # no new search starts once the budget is met. Results are taken in session
+    # order as they become available, so the output matches a serial search.
+    # Searches already running when the budget is met are still awaited.
     all_matches = []
     searched_sessions = []
 
-    for sid, monitor in sessions_to_search.items():
-        try:
-            matches = search_log_file(
-                log_file=monitor.session.log_file,
-                query=query,
-                context_lines=context_lines,
-                max_results=max_results,
-            )
-
-            # Add session_id to each match
-            for match in matches:
-                match["session_id"] = sid
-
-            all_matches.extend(matches)
-            searched_sessions.append(sid)
+    def search(monitor) -> list:
+        return search_log_file(
+            log_file=monitor.session.log_file,
+            query=query,
+            context_lines=context_lines,
+            max_results=max_results,
+        )
 
-            # Check if we've hit max_results
-            if len(all_matches) >= max_results:
-                all_matches = all_matches[:max_results]
+    sessions = list(sessions_to_search.items())
+    to_submit = iter(enumerate(sessions))
+    running = {}  # future → index into sessions
+    finished = {}  # index into sessions → completed future
+    next_index = 0
+    budget_met = False
+
+    with ThreadPoolExecutor(max_workers=max(1, min(SEARCH_WORKERS, len(sessions)))) as pool:
+        while not budget_met:
+            while len(running) < SEARCH_WORKERS:
+                item = next(to_submit, None)
+                if item is None:
+                    break
+                idx, (_, monitor) = item
+                running[pool.submit(search, monitor)] = idx
+            if not running:
                 break
 
-        except Exception as e:
-            logger.warning(f"Failed to search session {sid}: {str(e)}")
-            continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished[running.pop(future)] = future
+
+            # Take every result whose predecessors have all been taken
+            while next_index in finished:
+                sid = sessions[next_index][0]
+                future = finished.pop(next_index)
+                next_index += 1
+                try:
+                    matches = future.result()
+                except Exception as e:
+                    logger.warning(f"Failed to search session {sid}: {str(e)}")
+                    continue
+
+                # Add session_id to each match
+                for match in matches:
+                    match["session_id"] = sid
+
+                all_matches.extend(matches)
+                searched_sessions.append(sid)
+
+                # Check if we've hit max_results
+                if len(all_matches) >= max_results:
+                    all_matches = all_matches[:max_results]
+                    budget_met = True
+                    break
 
     logger.info(
-        f"Searched {len(searched_sessions)} sessions for '{query}', "
-        f"found {len(all_matches)} matches"
+        "Searched %d sessions for '%s', found %d matches",
+        len(searched_sessions),
+        query,
+        len(all_matches),
     )
 
     return {
@@ -254,8 +367,11 @@ def cleanup_old_sessions(retention_days: int = 7, dry_run: bool = False) -> dict
 
     action = "Would delete" if dry_run else "Deleted"
     logger.info(
-        f"{action} {result['total_deleted']} sessions "
-        f"({result['bytes_freed']} bytes freed, retention={retention_days} days)"
+        "%s %d sessions (%d bytes freed, retention=%d days)",
+        action,
+        result["total_deleted"],
+        result["bytes_freed"],
+        retention_days,
     )
 
     return result
@@ -8,7 +8,7 @@ from fastmcp.exceptions import ToolError
 
 from shellsidekick.core.monitor import SessionMonitor
 from shellsidekick.mcp.server import mcp
-from shellsidekick.mcp.session_state import active_sessions
+from shellsidekick.mcp.session_state import active_sessions, flush_pattern_learner
 from shellsidekick.models.session import Session, SessionState, SessionType
 from shellsidekick.utils.logging import get_logger
 
@@ -60,7 +60,7 @@ def start_session_monitor(
     monitor = SessionMonitor(session)
     active_sessions[session_id] = monitor
 
-    logger.info(f"Started monitoring session {session_id} ({session_type}): {log_file}")
+    logger.info("Started monitoring session %s (%s): %s", session_id, session_type, log_file)
 
     return session.to_dict()
 
@@ -97,6 +97,40 @@ def get_session_updates(session_id: str) -> dict:
         raise ToolError(f"Failed to read log file: {str(e)}", code="FILE_READ_ERROR")
 
 
+@mcp.tool()
+def get_all_session_updates() -> dict:
+    """Retrieve new content from every monitored session in one call.
+
+    Equivalent to calling get_session_updates for each active session, but
+    with a single tool round trip. Idle sessions cost one stat() each.
+
+    Returns:
+        Dictionary with:
+        - updates: List of {session_id, new_content, file_position, has_more}
+        - failed_sessions: List of {session_id, error} for unreadable logs
+    """
+    updates = []
+    failed_sessions = []
+
+    for session_id, monitor in list(active_sessions.items()):
+        try:
+            new_content, has_more = monitor.get_updates()
+        except (FileNotFoundError, PermissionError) as e:
+            failed_sessions.append({"session_id": session_id, "error": str(e)})
+            continue
+
+        updates.append(
+            {
+                "session_id": session_id,
+                "new_content": new_content,
+                "file_position": monitor.session.file_position,
+                "has_more": has_more,
+            }
+        )
+
+    return {"updates": updates, "failed_sessions": failed_sessions}
+
+
 @mcp.tool()
 def stop_session_monitor(session_id: str, save_log: bool = False) -> dict:
     """Stop monitoring a session and cleanup resources.
@@ -120,6 +154,12 @@ def stop_session_monitor(session_id: str, save_log: bool = False) -> dict:
     # Remove from active sessions
     del active_sessions[session_id]
 
-    logger.info(f"Stopped session {session_id}, processed {stats['total_bytes_processed']} bytes")
+    # Persist any pattern updates still waiting on the save interval; a server
+    # that never tracked input has no learner to create here
+    flush_pattern_learner()
+
+    logger.info(
+        "Stopped session %s, processed %d bytes", session_id, stats["total_bytes_processed"]
+    )
 
     return stats
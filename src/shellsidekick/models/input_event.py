@@ -12,13 +12,25 @@ class InputSource(str, Enum):
     AI_SUGGESTED = "ai_suggested"
     AUTO_INJECTED = "auto_injected"
 
+    @classmethod
+    def from_value(cls, value: str) -> "InputSource | None":
+        """Look up a member by value, returning None instead of raising.
 
-@dataclass
+        A plain dict lookup, cheaper than InputSource(value) and its
+        exception path for unknown values.
+        """
+        return _INPUT_SOURCE_BY_VALUE.get(value)
+
+
+_INPUT_SOURCE_BY_VALUE: dict[str, InputSource] = {m.value: m for m in InputSource}
+
+
+@dataclass(slots=True)
 class InputEvent:
     """Represents a user input event.
 
     Attributes:
-        event_id: Unique event identifier (UUID4)
+        event_id: Unique event identifier (process prefix + sequence number)
         session_id: Associated session ID
         timestamp: When input was provided (ISO 8601)
         prompt_text: The prompt that triggered input
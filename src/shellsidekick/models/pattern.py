@@ -1,12 +1,16 @@
 """Pattern entity for learned prompt-response patterns."""
 
-from dataclasses import dataclass
+import heapq
+import sys
+from array import array
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
 from datetime import datetime
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ResponseStats:
-    """Statistics for a specific response to a prompt."""
+    """Statistics for a specific response to a prompt (a read-only snapshot)."""
 
     count: int
     success_count: int
@@ -17,14 +21,116 @@ class ResponseStats:
         return self.success_count / self.count if self.count > 0 else 0.0
 
 
-@dataclass
+class ResponseTable(Mapping[str, ResponseStats]):
+    """Response statistics stored column-wise (structure of arrays).
+
+    Counts live in two parallel ``array('Q')`` columns indexed through a
+    text → row dict, instead of one ResponseStats object per response. Reads
+    through the Mapping interface return ResponseStats snapshots. Updates go
+    through Pattern.record_response(), so the owning pattern's memoized dict
+    is always dropped with them.
+    """
+
+    __slots__ = ("_index", "_top", "texts", "counts", "success_counts")
+
+    def __init__(self, stats: Mapping[str, ResponseStats] | None = None):
+        """Initialize table, optionally from a response text → stats mapping.
+
+        Args:
+            stats: Existing statistics to copy in (insertion order is kept)
+        """
+        self._index: dict[str, int] = {}
+        self._top = -1  # row of the most used response (earliest on ties)
+        self.texts: list[str] = []
+        self.counts = array("Q")
+        self.success_counts = array("Q")
+        if stats:
+            for text, item in stats.items():
+                self._append(text, item.count, item.success_count)
+
+    @classmethod
+    def from_counts(cls, data: Mapping[str, Mapping[str, int]]) -> "ResponseTable":
+        """Build a table from serialized ``{text: {"count", "success_count"}}`` data."""
+        table = cls()
+        for text, stats_dict in data.items():
+            table._append(text, stats_dict["count"], stats_dict["success_count"])
+        return table
+
+    def _append(self, text: str, count: int, success_count: int) -> None:
+        row = len(self.texts)
+        self._index[text] = row
+        self.texts.append(text)
+        self.counts.append(count)
+        self.success_counts.append(success_count)
+        if self._top < 0 or count > self.counts[self._top]:
+            self._top = row
+
+    def _record(self, text: str, success: bool) -> None:
+        """Count one more use of a response, maintaining the most used row.
+
+        Args:
+            text: Response text
+            success: Whether the response was successful
+        """
+        row = self._index.get(text)
+        if row is None:
+            self._append(text, 1, 1 if success else 0)
+            return
+        self.counts[row] += 1
+        if success:
+            self.success_counts[row] += 1
+
+        # Counts only grow by one, so the new top is either unchanged or this
+        # row; on a tie the earlier row wins, as with max()
+        top_count = self.counts[self._top]
+        if self.counts[row] > top_count or (self.counts[row] == top_count and row < self._top):
+            self._top = row
+
+    def rows(self) -> Iterator[tuple[str, int, int]]:
+        """Iterate (text, count, success_count) without building snapshots."""
+        return zip(self.texts, self.counts, self.success_counts)
+
+    def top(self) -> tuple[str, ResponseStats] | None:
+        """Return the most used response in O(1), or None if there are none."""
+        if self._top < 0:
+            return None
+        return self.texts[self._top], self._stats(self._top)
+
+    def most_common(self, n: int) -> list[tuple[str, ResponseStats]]:
+        """Return the n most used responses, most common first.
+
+        Ties keep insertion order, matching a stable descending sort.
+        """
+        rows = heapq.nlargest(n, range(len(self.texts)), key=self.counts.__getitem__)
+        return [(self.texts[i], self._stats(i)) for i in rows]
+
+    def _stats(self, row: int) -> ResponseStats:
+        return ResponseStats(count=self.counts[row], success_count=self.success_counts[row])
+
+    def __getitem__(self, text: str) -> ResponseStats:
+        return self._stats(self._index[text])
+
+    def __contains__(self, text: object) -> bool:
+        return text in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.texts)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __repr__(self) -> str:
+        return f"ResponseTable({dict(self.items())!r})"
+
+
+@dataclass(slots=True)
 class Pattern:
     """Represents a learned prompt-response pattern.
 
     Attributes:
         pattern_id: Unique pattern identifier (hash of prompt_text)
         prompt_text: The prompt text (normalized)
-        responses: Map of response text → statistics
+        responses: Map of response text → statistics (column-stored)
         total_occurrences: Total times this prompt appeared
         last_seen: Last time this prompt was detected (ISO 8601)
         created_at: When pattern was first learned (ISO 8601)
@@ -32,31 +138,84 @@ class Pattern:
 
     pattern_id: str
     prompt_text: str
-    responses: dict[str, ResponseStats]
+    responses: ResponseTable
     total_occurrences: int
     last_seen: datetime
     created_at: datetime
+    # Memoized _serialized() result and last_seen ISO string; dropped whenever the
+    # pattern changes
+    _dict_cache: dict | None = field(default=None, init=False, repr=False, compare=False)
+    _last_seen_iso: str | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value) -> None:
+        object.__setattr__(self, name, value)
+        if name not in ("_dict_cache", "_last_seen_iso"):
+            object.__setattr__(self, "_dict_cache", None)
+            object.__setattr__(self, "_last_seen_iso", None)
+
+    def __post_init__(self):
+        # Share the prompt string with every event that saw the same prompt
+        self.prompt_text = sys.intern(self.prompt_text)
+        if not isinstance(self.responses, ResponseTable):
+            self.responses = ResponseTable(self.responses)
+
+    def record_response(self, input_text: str, success: bool, now: datetime) -> None:
+        """Count one more occurrence of this prompt answered with input_text.
+
+        Args:
+            input_text: The response text
+            success: Whether the response was successful
+            now: Time of the occurrence
+        """
+        self.responses._record(input_text, success)
+        self.total_occurrences += 1
+        self.last_seen = now
+
+    @property
+    def last_seen_iso(self) -> str:
+        """last_seen in ISO 8601, formatted once per update."""
+        if self._last_seen_iso is None:
+            self._last_seen_iso = self.last_seen.isoformat()
+        return self._last_seen_iso
 
     def get_most_common_response(self) -> tuple[str, ResponseStats] | None:
-        """Get the most frequently used response."""
-        if not self.responses:
-            return None
-        return max(self.responses.items(), key=lambda x: x[1].count)
+        """Get the most frequently used response.
+
+        The response table tracks its most used row as it is updated, so this
+        does not scan the responses.
+        """
+        return self.responses.top()
 
     def to_dict(self) -> dict:
-        """Convert to JSON-serializable dict for storage."""
+        """Convert to JSON-serializable dict for storage.
+
+        Returns a new dict the caller may modify.
+        """
+        data = self._serialized()
         return {
-            "pattern_id": self.pattern_id,
-            "prompt_text": self.prompt_text,
-            "responses": {
-                text: {"count": stats.count, "success_count": stats.success_count}
-                for text, stats in self.responses.items()
-            },
-            "total_occurrences": self.total_occurrences,
-            "last_seen": self.last_seen.isoformat(),
-            "created_at": self.created_at.isoformat(),
+            **data,
+            "responses": {text: dict(stats) for text, stats in data["responses"].items()},
         }
 
+    def _serialized(self) -> dict:
+        """to_dict() result memoized until the pattern changes; must not be mutated.
+
+        Saving many patterns then only re-serializes the ones that were updated.
+        """
+        if self._dict_cache is None:
+            self._dict_cache = {
+                "pattern_id": self.pattern_id,
+                "prompt_text": self.prompt_text,
+                "responses": {
+                    text: {"count": count, "success_count": success_count}
+                    for text, count, success_count in self.responses.rows()
+                },
+                "total_occurrences": self.total_occurrences,
+                "last_seen": self.last_seen_iso,
+                "created_at": self.created_at.isoformat(),
+            }
+        return self._dict_cache
+
     @classmethod
     def from_dict(cls, data: dict) -> "Pattern":
         """Reconstruct Pattern from JSON dict.
@@ -67,13 +226,8 @@ class Pattern:
         Returns:
             Pattern instance
         """
-        # Reconstruct ResponseStats objects
-        responses = {
-            text: ResponseStats(
-                count=stats_dict["count"], success_count=stats_dict["success_count"]
-            )
-            for text, stats_dict in data["responses"].items()
-        }
+        # Rebuild the response columns directly from the stored counts
+        responses = ResponseTable.from_counts(data["responses"])
 
         return cls(
             pattern_id=data["pattern_id"],
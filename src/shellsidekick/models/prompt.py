@@ -1,6 +1,6 @@
 """PromptDetection entity and related enums."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
@@ -17,17 +17,21 @@ class PromptType(str, Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True, init=False)
 class PromptDetection:
     """Represents a detected terminal prompt.
 
+    Pass either ``timestamp`` (a datetime) or ``timestamp_ns`` (nanoseconds
+    since the epoch). The detector passes ``timestamp_ns`` so that the datetime
+    is only built if a caller reads ``timestamp``.
+
     Attributes:
         prompt_text: The text of the detected prompt
         confidence: Detection confidence score (0.0-1.0)
         prompt_type: Type of prompt detected
         matched_pattern: Regex pattern that matched (for debugging)
         file_position: Position in log file where detected (bytes)
-        timestamp: When prompt was detected (ISO 8601)
+        timestamp_ns: When prompt was detected (nanoseconds since the epoch)
         is_dangerous: Whether prompt involves dangerous operations
     """
 
@@ -36,8 +40,45 @@ class PromptDetection:
     prompt_type: PromptType
     matched_pattern: str
     file_position: int
-    timestamp: datetime
-    is_dangerous: bool = False
+    timestamp_ns: int
+    is_dangerous: bool
+    _timestamp: datetime | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __init__(
+        self,
+        prompt_text: str,
+        confidence: float,
+        prompt_type: PromptType,
+        matched_pattern: str,
+        file_position: int,
+        timestamp: datetime | None = None,
+        is_dangerous: bool = False,
+        *,
+        timestamp_ns: int | None = None,
+    ) -> None:
+        if timestamp_ns is None:
+            if timestamp is None:
+                raise TypeError("PromptDetection requires timestamp or timestamp_ns")
+            # Whole seconds convert exactly (and floor, also before the epoch);
+            # the microseconds are added as integers
+            whole_seconds = int(timestamp.replace(microsecond=0).timestamp())
+            timestamp_ns = whole_seconds * 1_000_000_000 + timestamp.microsecond * 1000
+        self.prompt_text = prompt_text
+        self.confidence = confidence
+        self.prompt_type = prompt_type
+        self.matched_pattern = matched_pattern
+        self.file_position = file_position
+        self.timestamp_ns = timestamp_ns
+        self.is_dangerous = is_dangerous
+        self._timestamp = timestamp
+
+    @property
+    def timestamp(self) -> datetime:
+        """When prompt was detected, as a local datetime (built on first access)."""
+        if self._timestamp is None:
+            seconds, nanos = divmod(self.timestamp_ns, 1_000_000_000)
+            self._timestamp = datetime.fromtimestamp(seconds).replace(microsecond=nanos // 1000)
+        return self._timestamp
 
     def to_dict(self) -> dict:
         """Convert to JSON-serializable dict for MCP responses."""
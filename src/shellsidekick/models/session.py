@@ -20,7 +20,7 @@ class SessionState(str, Enum):
     STOPPED = "stopped"
 
 
-@dataclass
+@dataclass(slots=True)
 class Session:
     """Represents a monitored terminal session.
 
@@ -1,35 +1,188 @@
 """File position tracking and incremental file reading utilities."""
 
+import mmap
 import os
-from typing import Tuple
+import threading
+from typing import Dict, Tuple
 
+# Bytes requested per os.pread() call when reading new content
+READ_CHUNK_SIZE = 1024 * 1024
 
-def read_from_position(file_path: str, position: int) -> Tuple[str, int]:
+
+class _CachedFile:
+    """A descriptor kept open by read_from_position, with its in-flight readers.
+
+    Reads happen outside _open_files_lock, so a descriptor dropped from the
+    cache while a read is using it is only closed once that read finishes.
+    """
+
+    __slots__ = ("fd", "dev", "ino", "readers", "closed")
+
+    def __init__(self, fd: int, dev: int, ino: int):
+        self.fd = fd
+        self.dev = dev
+        self.ino = ino
+        self.readers = 0
+        self.closed = False
+
+
+# Descriptors kept open by read_from_position, keyed by path
+_open_files: Dict[str, _CachedFile] = {}
+_open_files_lock = threading.Lock()
+
+
+def _translate_newlines(text: str) -> str:
+    """Apply universal-newline translation (\\r\\n and lone \\r become \\n)."""
+    if "\r" not in text:
+        return text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _open_cached(file_path: str) -> Tuple[_CachedFile, int]:
+    """Return the cached descriptor for file_path and the file's current size.
+
+    The descriptor is reused across calls while the path still names the
+    same file (same device and inode); a replaced file is reopened and a
+    deleted one is closed. Must be called with _open_files_lock held.
+    """
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        _close_cached(file_path)
+        raise FileNotFoundError(f"File not found: {file_path}") from None
+    except PermissionError:
+        raise PermissionError(f"Cannot read file: {file_path}") from None
+
+    cached = _open_files.get(file_path)
+    if cached is not None:
+        if (cached.dev, cached.ino) == (st.st_dev, st.st_ino):
+            return cached, st.st_size
+        _close_cached(file_path)
+
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {file_path}") from None
+    except PermissionError:
+        raise PermissionError(f"Cannot read file: {file_path}") from None
+
+    st = os.fstat(fd)
+    cached = _open_files[file_path] = _CachedFile(fd, st.st_dev, st.st_ino)
+    return cached, st.st_size
+
+
+def _close_cached(file_path: str) -> None:
+    """Drop file_path from the cache, closing its descriptor unless a read holds it.
+
+    Must be called with _open_files_lock held.
+    """
+    cached = _open_files.pop(file_path, None)
+    if cached is not None:
+        cached.closed = True
+        if cached.readers == 0:
+            os.close(cached.fd)
+
+
+def close_file(file_path: str) -> None:
+    """Close the descriptor read_from_position keeps open for a file, if any.
+
+    Args:
+        file_path: Absolute path to file
+    """
+    with _open_files_lock:
+        _close_cached(file_path)
+
+
+def read_from_position(file_path: str, position: int) -> Tuple[str, int, int]:
     """Read file content from a specific position.
 
+    The file descriptor stays open between calls (see close_file), so a poll
+    costs a stat() plus a pread() of the new bytes instead of an
+    open/seek/read/fstat/close sequence; with nothing new, only the stat().
+    Content is read up to the size seen by that stat(). The lock shared by
+    all files is only held for the lookup, not for the read itself.
+
     Args:
         file_path: Absolute path to file
         position: Byte position to start reading from
 
     Returns:
-        Tuple of (new_content, new_position)
+        Tuple of (new_content, new_position, file_size)
 
     Raises:
         FileNotFoundError: If file doesn't exist
         PermissionError: If file is not readable
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
+    with _open_files_lock:
+        cached, file_size = _open_cached(file_path)
+        cached.readers += 1
+
+    chunks = []
+    offset = position
+    try:
+        while offset < file_size:
+            chunk = os.pread(cached.fd, min(READ_CHUNK_SIZE, file_size - offset), offset)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+    finally:
+        with _open_files_lock:
+            cached.readers -= 1
+            if cached.closed and cached.readers == 0:
+                os.close(cached.fd)
+
+    data = b"".join(chunks)
+    new_content = _translate_newlines(data.decode("utf-8", errors="replace"))
+    return new_content, offset, file_size
+
+
+def read_tail_lines(file_path: str, max_lines: int = 50) -> str:
+    """Read only the last lines of a file.
+
+    The file is memory-mapped and scanned backwards for newlines, so only the
+    tail is ever copied and decoded regardless of how large the log has grown.
+    Matches reading the whole file in text mode and keeping the last
+    ``max_lines`` lines.
 
-    if not os.access(file_path, os.R_OK):
-        raise PermissionError(f"Cannot read file: {file_path}")
+    Args:
+        file_path: Absolute path to file
+        max_lines: Number of trailing lines to return
 
-    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-        f.seek(position)
-        new_content = f.read()
-        new_position = f.tell()
+    Returns:
+        The last ``max_lines`` lines of the file, joined by newlines
 
-    return new_content, new_position
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        PermissionError: If file is not readable
+    """
+    try:
+        f = open(file_path, "rb")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {file_path}") from None
+    except PermissionError:
+        raise PermissionError(f"Cannot read file: {file_path}") from None
+
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = len(mm)
+            for _ in range(max_lines):
+                start = mm.rfind(b"\n", 0, start)
+                if start == -1:
+                    break
+            data = mm[start + 1 :]
+
+    # Lone carriage returns also end lines in text mode, so trim again after
+    # translation; the byte tail always holds at least max_lines lines
+    text = _translate_newlines(data.decode("utf-8", errors="replace"))
+    pos = len(text)
+    for _ in range(max_lines):
+        pos = text.rfind("\n", 0, pos)
+        if pos == -1:
+            return text
+    return text[pos + 1 :]
 
 
 def get_file_size(file_path: str) -> int:
@@ -1,65 +1,114 @@
 """Security utilities for password detection and dangerous command detection."""
 
 import re
-from typing import List
-
-# Password detection patterns
-PASSWORD_PATTERNS = [
-    re.compile(r"password\s*:", re.IGNORECASE),
-    re.compile(r"passphrase\s*:", re.IGNORECASE),
-    re.compile(r"pass\s*:", re.IGNORECASE),
-    re.compile(r"enter\s+password", re.IGNORECASE),
-    re.compile(r"authentication\s+required", re.IGNORECASE),
+from functools import lru_cache
+from typing import List, Tuple
+
+# Password detection patterns, each paired with a lowercase literal that any
+# match must contain
+_PASSWORD_RULES = [
+    ("password", re.compile(r"password\s*:", re.IGNORECASE)),
+    ("passphrase", re.compile(r"passphrase\s*:", re.IGNORECASE)),
+    ("pass", re.compile(r"pass\s*:", re.IGNORECASE)),
+    ("password", re.compile(r"enter\s+password", re.IGNORECASE)),
+    ("authentication", re.compile(r"authentication\s+required", re.IGNORECASE)),
 ]
+PASSWORD_PATTERNS = [pattern for _, pattern in _PASSWORD_RULES]
+
+
+# Dangerous command patterns, paired like _PASSWORD_RULES
+_DANGEROUS_RULES = [
+    ("rm", re.compile(r"\brm\s+-rf\s+/", re.IGNORECASE)),
+    ("mkfs", re.compile(r"\bmkfs\b", re.IGNORECASE)),
+    ("dd", re.compile(r"\bdd\s+if=", re.IGNORECASE)),
+    (":()", re.compile(r":[(][)]\{.*?[:][|&].*?\};:", re.IGNORECASE)),  # Fork bomb
+    ("format", re.compile(r"\bformat\s+[A-Z]:", re.IGNORECASE)),
+    ("del", re.compile(r"\bdel\s+/[fqs]", re.IGNORECASE)),
+    ("delete", re.compile(r"\bdelete\b.*?\btable", re.IGNORECASE)),
+    ("delete", re.compile(r"\bdelete\b.*?\b(all|files|data|everything)", re.IGNORECASE)),
+    ("drop", re.compile(r"\bdrop\s+table", re.IGNORECASE)),
+    ("truncate", re.compile(r"\btruncate\b.*?\btable", re.IGNORECASE)),
+    ("remove", re.compile(r"\bremove\b.*?\b(all|files|data)", re.IGNORECASE)),
+    ("destroy", re.compile(r"\bdestroy\b", re.IGNORECASE)),
+    ("wipe", re.compile(r"\bwipe\b", re.IGNORECASE)),
+    ("erase", re.compile(r"\berase\b.*?\b(all|files|data)", re.IGNORECASE)),
+]
+DANGEROUS_PATTERNS = [pattern for _, pattern in _DANGEROUS_RULES]
 
+# Longest text whose check result is memoized. Texts arrive from MCP clients,
+# so longer ones are scanned uncached rather than pinned in the cache
+CACHE_MAX_TEXT_LENGTH = 256
+
+
+def _candidate_patterns(
+    text: str, rules: List[Tuple[str, re.Pattern]], patterns: List[re.Pattern]
+) -> List[re.Pattern]:
+    """Select the patterns that could match text, in their original order.
+
+    For ASCII text, a pattern whose literal is absent cannot match and is
+    skipped without running the regex. Non-ASCII text gets every pattern,
+    because IGNORECASE folds characters such as "ſ" that lower() keeps.
+    """
+    if not text.isascii():
+        return patterns
+    lowered = text.lower()
+    return [pattern for literal, pattern in rules if literal in lowered]
+
+
+def _matches_any(
+    text: str, rules: List[Tuple[str, re.Pattern]], patterns: List[re.Pattern]
+) -> bool:
+    """Return True if any of the patterns matches text."""
+    for pattern in _candidate_patterns(text, rules, patterns):
+        if pattern.search(text):
+            return True
+    return False
 
-# Dangerous command patterns
-DANGEROUS_PATTERNS = [
-    re.compile(r"\brm\s+-rf\s+/", re.IGNORECASE),
-    re.compile(r"\bmkfs\b", re.IGNORECASE),
-    re.compile(r"\bdd\s+if=", re.IGNORECASE),
-    re.compile(r":[(][)]\{.*?[:][|&].*?\};:", re.IGNORECASE),  # Fork bomb
-    re.compile(r"\bformat\s+[A-Z]:", re.IGNORECASE),
-    re.compile(r"\bdel\s+/[fqs]", re.IGNORECASE),
-    re.compile(r"\bdelete\b.*?\btable", re.IGNORECASE),
-    re.compile(r"\bdelete\b.*?\b(all|files|data|everything)", re.IGNORECASE),
-    re.compile(r"\bdrop\s+table", re.IGNORECASE),
-    re.compile(r"\btruncate\b.*?\btable", re.IGNORECASE),
-    re.compile(r"\bremove\b.*?\b(all|files|data)", re.IGNORECASE),
-    re.compile(r"\bdestroy\b", re.IGNORECASE),
-    re.compile(r"\bwipe\b", re.IGNORECASE),
-    re.compile(r"\berase\b.*?\b(all|files|data)", re.IGNORECASE),
-]
+
+@lru_cache(maxsize=4096)
+def _is_password_prompt_cached(text: str) -> bool:
+    """Memoized password check for short texts (see is_password_prompt)."""
+    return _matches_any(text, _PASSWORD_RULES, PASSWORD_PATTERNS)
+
+
+@lru_cache(maxsize=4096)
+def _is_dangerous_operation_cached(text: str) -> bool:
+    """Memoized dangerous-operation check for short texts (see is_dangerous_operation)."""
+    return _matches_any(text, _DANGEROUS_RULES, DANGEROUS_PATTERNS)
 
 
 def is_password_prompt(text: str) -> bool:
     """Check if text appears to be a password prompt.
 
+    Results for texts up to CACHE_MAX_TEXT_LENGTH characters are memoized:
+    prompt texts are short and recur constantly.
+
     Args:
         text: Text to check
 
     Returns:
         True if text matches password patterns
     """
-    for pattern in PASSWORD_PATTERNS:
-        if pattern.search(text):
-            return True
-    return False
+    if len(text) <= CACHE_MAX_TEXT_LENGTH:
+        return _is_password_prompt_cached(text)
+    return _matches_any(text, _PASSWORD_RULES, PASSWORD_PATTERNS)
 
 
 def is_dangerous_operation(text: str) -> bool:
     """Check if text involves dangerous operations.
 
+    Results for texts up to CACHE_MAX_TEXT_LENGTH characters are memoized:
+    prompt texts are short and recur constantly.
+
     Args:
         text: Text to check (prompt or command)
 
     Returns:
         True if text contains dangerous keywords
     """
-    for pattern in DANGEROUS_PATTERNS:
-        if pattern.search(text):
-            return True
-    return False
+    if len(text) <= CACHE_MAX_TEXT_LENGTH:
+        return _is_dangerous_operation_cached(text)
+    return _matches_any(text, _DANGEROUS_RULES, DANGEROUS_PATTERNS)
 
 
 def redact_password(text: str) -> str:
@@ -87,7 +136,7 @@ def get_dangerous_keywords(text: str) -> List[str]:
         List of matched dangerous keywords
     """
     keywords = []
-    for pattern in DANGEROUS_PATTERNS:
+    for pattern in _candidate_patterns(text, _DANGEROUS_RULES, DANGEROUS_PATTERNS):
         match = pattern.search(text)
         if match:
             keywords.append(match.group(0))
@@ -1,6 +1,7 @@
 """Pytest configuration and fixtures."""
 
 import os
+import sys
 import tempfile
 
 import pytest
@@ -20,6 +21,14 @@ def temp_log_file():
         os.remove(log_path)
 
 
+@pytest.fixture(scope="session")
+def large_log_file(tmp_path_factory):
+    """Create a 10,000-line log ending in a password prompt, shared read-only."""
+    log_path = tmp_path_factory.mktemp("logs") / "large.log"
+    log_path.write_text("".join(f"[{i}] Processing task...\n" for i in range(10000)) + "Password: ")
+    return log_path
+
+
 @pytest.fixture
 def temp_session_dir(tmp_path):
     """Create a temporary session directory."""
@@ -28,11 +37,25 @@ def temp_session_dir(tmp_path):
     return session_dir
 
 
+@pytest.fixture
+def isolated_pattern_learner(tmp_path, monkeypatch):
+    """Point pattern and history storage at tmp_path and install a fresh global learner."""
+    from shellsidekick.core import storage
+    from shellsidekick.core.patterns import PatternLearner
+    from shellsidekick.mcp import session_state
+
+    monkeypatch.setattr(storage, "HISTORY_DIR", tmp_path / "history")
+    monkeypatch.setattr(storage, "PATTERNS_FILE", tmp_path / "patterns.json")
+    learner = PatternLearner(auto_load=False)
+    monkeypatch.setattr(session_state, "_pattern_learner", learner)
+    return learner
+
+
 @pytest.fixture(autouse=True)
 def cleanup_active_sessions():
     """Clean up active sessions after each test."""
     yield
-    # Import here to avoid circular dependencies
-    from shellsidekick.mcp.session_state import active_sessions
-
-    active_sessions.clear()
+    # Only a test that imported the session state can have added sessions
+    session_state = sys.modules.get("shellsidekick.mcp.session_state")
+    if session_state is not None:
+        session_state.active_sessions.clear()
@@ -1,6 +1,5 @@
 """Contract tests for prompt detection MCP tools."""
 
-
 import pytest
 
 
@@ -67,9 +66,8 @@ class TestDetectionPerformance:
 
         detector = PromptDetector()
 
-        # Create test content with prompt at the end
-        test_content = "Starting process...\n" * 100
-        test_content += "Password: "
+        # Create test content with prompt at the end (built outside the timed region)
+        test_content = "".join(["Starting process...\n"] * 100 + ["Password: "])
 
         # Measure detection time
         start_time = time.perf_counter()
@@ -83,7 +81,7 @@ class TestDetectionPerformance:
         assert result is not None
         assert result.prompt_type.value == "password"
 
-    def test_throughput_10k_lines_per_second(self, tmp_path):
+    def test_throughput_10k_lines_per_second(self, large_log_file):
         """Test processing 10,000 lines per second."""
         import time
         import uuid
@@ -92,17 +90,13 @@ class TestDetectionPerformance:
         from shellsidekick.core.monitor import SessionMonitor
         from shellsidekick.models.session import Session, SessionState, SessionType
 
-        # Create log file with 10,000 lines
-        log_file = tmp_path / "large.log"
+        # Shared log file with 10,000 lines
         num_lines = 10000
-        with open(log_file, "w") as f:
-            for i in range(num_lines):
-                f.write(f"Log line {i}: Processing request...\n")
 
         session = Session(
             session_id=str(uuid.uuid4()),
             session_type=SessionType.FILE,
-            log_file=str(log_file),
+            log_file=str(large_log_file),
             file_position=0,
             start_time=datetime.now(),
             state=SessionState.ACTIVE,
@@ -125,7 +119,7 @@ class TestDetectionPerformance:
         )
         assert len(content) > 0
 
-    def test_large_file_performance(self, tmp_path):
+    def test_large_file_performance(self, large_log_file):
         """Test detection performance with large log files."""
         import time
         import uuid
@@ -135,17 +129,11 @@ class TestDetectionPerformance:
         from shellsidekick.core.monitor import SessionMonitor
         from shellsidekick.models.session import Session, SessionState, SessionType
 
-        # Create large log file with 10,000 lines + password prompt
-        log_file = tmp_path / "large.log"
-        with open(log_file, "w") as f:
-            for i in range(10000):
-                f.write(f"[{i}] Processing task...\n")
-            f.write("Password: ")
-
+        # Shared large log file: 10,000 lines + password prompt
         session = Session(
             session_id=str(uuid.uuid4()),
             session_type=SessionType.FILE,
-            log_file=str(log_file),
+            log_file=str(large_log_file),
             file_position=0,
             start_time=datetime.now(),
             state=SessionState.ACTIVE,
@@ -160,10 +148,9 @@ class TestDetectionPerformance:
         content, _ = monitor.get_updates()
         end_read = time.perf_counter()
 
-        # Detect prompt (testing last few lines for efficiency)
-        last_lines = "\n".join(content.split("\n")[-20:])
+        # Detect prompt on the whole buffer; the detector scans only its tail
         start_detect = time.perf_counter()
-        result = detector.detect(last_lines)
+        result = detector.detect(content)
         end_detect = time.perf_counter()
 
         total_time_ms = (end_detect - start_read) * 1000
@@ -386,6 +373,35 @@ class TestInferExpectedInput:
         assert "2" in input_texts
         assert "3" in input_texts
 
+    @pytest.mark.parametrize(
+        ("prompt_text", "prompt_type"),
+        [
+            ("Password:", "password"),
+            ("Continue? (yes/no)", "yes_no"),
+            ("Delete all files? (yes/no)", "yes_no"),
+            ("[1] Option A\n[2] Option B", "choice"),
+            ("Enter file path:", "path"),
+            ("???", "unknown"),
+        ],
+    )
+    def test_suggestions_are_callers_own_list(self, prompt_text, prompt_type):
+        """Test that callers can extend suggestions without affecting later calls."""
+        from shellsidekick.core.inference import InputInferenceEngine, InputSuggestion
+        from shellsidekick.models.prompt import PromptType
+
+        prompt_type = PromptType(prompt_type)
+        engine = InputInferenceEngine()
+        suggestions, _ = engine.infer_inputs(prompt_text=prompt_text, prompt_type=prompt_type)
+        expected = list(suggestions)
+
+        assert isinstance(suggestions, list)
+        suggestions.append(
+            InputSuggestion(input_text="x", confidence=0.1, source="default", reasoning="extra")
+        )
+
+        again, _ = engine.infer_inputs(prompt_text=prompt_text, prompt_type=prompt_type)
+        assert again == expected
+
 
 class TestPatternBasedSuggestions:
     """Contract tests for pattern learning integration (T053)."""
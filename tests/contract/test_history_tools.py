@@ -5,6 +5,78 @@ import os
 import pytest
 
 
+def _event(**overrides) -> dict:
+    """Build one valid track_input_events event, with optional field overrides."""
+    event = {
+        "session_id": "batch-session",
+        "prompt_text": "Continue? (yes/no)",
+        "input_text": "yes",
+        "success": True,
+        "input_source": "user_typed",
+        "response_time_ms": 120,
+    }
+    event.update(overrides)
+    return event
+
+
+class TestTrackInputEventsTool:
+    """Contract tests for the track_input_events MCP tool."""
+
+    @pytest.mark.asyncio
+    async def test_batch_recorded_in_order(self, isolated_pattern_learner):
+        """Test that every event in a valid batch is recorded, in order."""
+        from fastmcp import Client
+
+        from shellsidekick.mcp.server import mcp
+
+        events = [_event(input_text="yes"), _event(input_text="no", success=False)]
+        async with Client(mcp) as client:
+            result = await client.call_tool("track_input_events", {"events": events})
+
+        assert [r["recorded"] for r in result.data["results"]] == [True, True]
+        pattern = isolated_pattern_learner.get_pattern_by_prompt("Continue? (yes/no)")
+        assert pattern.total_occurrences == 2
+
+    @pytest.mark.asyncio
+    async def test_fields_are_coerced(self, isolated_pattern_learner):
+        """Test that string-encoded fields are coerced to their declared types."""
+        from fastmcp import Client
+
+        from shellsidekick.mcp.server import mcp
+
+        events = [_event(success="false", response_time_ms="250")]
+        async with Client(mcp) as client:
+            await client.call_tool("track_input_events", {"events": events})
+
+        event = isolated_pattern_learner.get_session_events("batch-session")[0]
+        assert event.success is False
+        assert event.response_time_ms == 250
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "bad_event",
+        [
+            _event(response_time_ms="abc"),
+            _event(success="maybe"),
+            _event(input_source="telepathy"),
+            {k: v for k, v in _event().items() if k != "prompt_text"},
+            42,
+        ],
+    )
+    async def test_invalid_event_records_nothing(self, isolated_pattern_learner, bad_event):
+        """Test that one invalid event rejects the whole batch."""
+        from fastmcp import Client
+        from fastmcp.exceptions import ToolError
+
+        from shellsidekick.mcp.server import mcp
+
+        async with Client(mcp) as client:
+            with pytest.raises(ToolError):
+                await client.call_tool("track_input_events", {"events": [_event(), bad_event]})
+
+        assert isolated_pattern_learner.get_patterns() == []
+
+
 class TestGetLearnedPatterns:
     """Contract tests for get_learned_patterns tool (User Story 3)."""
 
@@ -416,6 +488,84 @@ class TestSearchSessionHistory:
             )
 
 
+class TestSearchSessionHistoryTool:
+    """Contract tests for search_session_history across several sessions."""
+
+    @staticmethod
+    async def _start_sessions(client, tmp_path, count: int) -> list[str]:
+        """Start count monitored sessions whose logs each hold one ERROR line."""
+        session_ids = []
+        for i in range(count):
+            log_file = tmp_path / f"session-{i}.log"
+            log_file.write_text(f"ERROR in session {i}\n")
+            session_id = f"search-{i}"
+            await client.call_tool(
+                "start_session_monitor",
+                {"session_id": session_id, "session_type": "file", "log_file": str(log_file)},
+            )
+            session_ids.append(session_id)
+        return session_ids
+
+    @pytest.mark.asyncio
+    async def test_results_in_session_order(self, tmp_path, monkeypatch):
+        """Test that a slow first session still comes first in the results."""
+        import time
+
+        from fastmcp import Client
+
+        from shellsidekick.core import storage
+        from shellsidekick.mcp.server import mcp
+
+        real_search = storage.search_log_file
+
+        def slow_first(log_file, **kwargs):
+            if log_file.endswith("session-0.log"):
+                time.sleep(0.05)
+            return real_search(log_file, **kwargs)
+
+        monkeypatch.setattr(storage, "search_log_file", slow_first)
+
+        async with Client(mcp) as client:
+            session_ids = await self._start_sessions(client, tmp_path, 4)
+            result = await client.call_tool("search_session_history", {"query": "ERROR"})
+
+        assert result.data["searched_sessions"] == session_ids
+        assert [m["session_id"] for m in result.data["matches"]] == session_ids
+
+    @pytest.mark.asyncio
+    async def test_budget_stops_new_searches(self, tmp_path, monkeypatch):
+        """Test that no further logs are read once max_results is reached."""
+        import time
+
+        from fastmcp import Client
+
+        from shellsidekick.core import storage
+        from shellsidekick.mcp.server import mcp
+        from shellsidekick.mcp.tools import history
+
+        real_search = storage.search_log_file
+        searched = []
+
+        def recording_search(log_file, **kwargs):
+            searched.append(log_file)
+            if not log_file.endswith("session-0.log"):
+                time.sleep(0.05)
+            return real_search(log_file, **kwargs)
+
+        monkeypatch.setattr(storage, "search_log_file", recording_search)
+        monkeypatch.setattr(history, "SEARCH_WORKERS", 2)
+
+        async with Client(mcp) as client:
+            await self._start_sessions(client, tmp_path, 6)
+            result = await client.call_tool(
+                "search_session_history", {"query": "ERROR", "max_results": 1}
+            )
+
+        assert result.data["searched_sessions"] == ["search-0"]
+        assert result.data["total_matches"] == 1
+        assert len(searched) == 2
+
+
 class TestCleanupOldSessions:
     """Contract tests for cleanup_old_sessions MCP tool (User Story 4, T069-T070)."""
 
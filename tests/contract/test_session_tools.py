@@ -112,3 +112,90 @@ class TestStopSessionMonitor:
         # - Log file is deleted when save_log=False
         # - Log file is preserved when save_log=True
         pytest.skip("Waiting for MCP tool implementation")
+
+    @pytest.mark.asyncio
+    async def test_stop_session_saves_pending_patterns(self, tmp_path, isolated_pattern_learner):
+        """Test pattern updates still waiting on the save interval are persisted."""
+        from fastmcp import Client
+
+        from shellsidekick.core import storage
+        from shellsidekick.mcp.server import mcp
+        from shellsidekick.models.input_event import InputSource
+
+        log_file = tmp_path / "session.log"
+        log_file.write_text("")
+
+        async with Client(mcp) as client:
+            await client.call_tool(
+                "start_session_monitor",
+                {"session_id": "s1", "session_type": "file", "log_file": str(log_file)},
+            )
+
+            # The first update saves at once; the second waits on the interval
+            for _ in range(2):
+                isolated_pattern_learner.track_input_event(
+                    session_id="s1",
+                    prompt_text="Continue?",
+                    input_text="yes",
+                    success=True,
+                    input_source=InputSource.USER_TYPED,
+                    response_time_ms=100,
+                )
+            assert storage.load_patterns()[0]["total_occurrences"] == 1
+
+            await client.call_tool("stop_session_monitor", {"session_id": "s1", "save_log": True})
+
+        assert storage.load_patterns()[0]["total_occurrences"] == 2
+
+
+class TestGetAllSessionUpdates:
+    """Test get_all_session_updates MCP tool."""
+
+    @pytest.mark.asyncio
+    async def test_updates_from_every_session(self, tmp_path):
+        """Test new content from active sessions, an idle one, and a deleted log."""
+        from fastmcp import Client
+
+        from shellsidekick.mcp.server import mcp
+
+        logs = {name: tmp_path / f"{name}.log" for name in ("first", "second", "idle", "gone")}
+        for log_file in logs.values():
+            log_file.write_text("")
+
+        async with Client(mcp) as client:
+            for name, log_file in logs.items():
+                await client.call_tool(
+                    "start_session_monitor",
+                    {"session_id": name, "session_type": "file", "log_file": str(log_file)},
+                )
+
+            logs["first"].write_text("first output\n")
+            logs["second"].write_text("second output\nPassword: ")
+            logs["gone"].unlink()
+
+            result = await client.call_tool("get_all_session_updates", {})
+
+        updates = {u["session_id"]: u for u in result.data["updates"]}
+        assert set(updates) == {"first", "second", "idle"}
+        assert updates["first"]["new_content"] == "first output\n"
+        assert updates["first"]["file_position"] == len("first output\n")
+        assert updates["second"]["new_content"] == "second output\nPassword: "
+        assert updates["idle"]["new_content"] == ""
+        assert updates["idle"]["file_position"] == 0
+        assert all(u["has_more"] is False for u in updates.values())
+
+        failed = result.data["failed_sessions"]
+        assert [f["session_id"] for f in failed] == ["gone"]
+        assert "not found" in failed[0]["error"].lower()
+
+    @pytest.mark.asyncio
+    async def test_no_active_sessions(self):
+        """Test that no sessions yields empty lists."""
+        from fastmcp import Client
+
+        from shellsidekick.mcp.server import mcp
+
+        async with Client(mcp) as client:
+            result = await client.call_tool("get_all_session_updates", {})
+
+        assert result.data == {"updates": [], "failed_sessions": []}
@@ -180,3 +180,31 @@ def test_integration_end_to_end_suggestions():
     for suggestion in suggestions:
         assert len(suggestion.reasoning) > 0
         assert suggestion.confidence > 0.0
+
+
+def test_pattern_suggestions_limited_to_most_common():
+    """Test that only the most common learned responses are suggested."""
+    from datetime import datetime
+    from types import SimpleNamespace
+
+    from shellsidekick.core.inference import MAX_PATTERN_SUGGESTIONS, InputInferenceEngine
+    from shellsidekick.models.pattern import Pattern, ResponseStats
+    from shellsidekick.models.prompt import PromptType
+
+    responses = {f"opt{i}": ResponseStats(count=i + 1, success_count=i + 1) for i in range(25)}
+    pattern = Pattern(
+        pattern_id="p1",
+        prompt_text="Enter name:",
+        responses=responses,
+        total_occurrences=sum(stats.count for stats in responses.values()),
+        last_seen=datetime.now(),
+        created_at=datetime.now(),
+    )
+    learner = SimpleNamespace(get_pattern_by_prompt=lambda prompt_text: pattern)
+
+    engine = InputInferenceEngine(pattern_learner=learner)
+    suggestions, _ = engine.infer_inputs("Enter name:", PromptType.TEXT)
+
+    assert len(suggestions) == MAX_PATTERN_SUGGESTIONS
+    assert [s.input_text for s in suggestions[:3]] == ["opt24", "opt23", "opt22"]
+    assert all(s.source == "pattern_learning" for s in suggestions)
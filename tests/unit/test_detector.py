@@ -1,9 +1,12 @@
 """Unit tests for PromptDetector."""
 
+import dataclasses
+from datetime import datetime, timedelta
+
 import pytest
 
 from shellsidekick.core.detector import PromptDetector
-from shellsidekick.models.prompt import PromptType
+from shellsidekick.models.prompt import PromptDetection, PromptType
 
 
 class TestPromptDetectorInit:
@@ -245,6 +248,14 @@ class TestEdgeCases:
 
         assert result is None
 
+    def test_punctuation_free_password_prompt(self):
+        """Test that a prompt without trigger punctuation is still detected."""
+        detector = PromptDetector()
+        result = detector.detect("Login required\nEnter your password")
+
+        assert result is not None
+        assert result.prompt_type == PromptType.PASSWORD
+
     def test_very_long_content(self):
         """Test that detector focuses on recent lines (last 50)."""
         detector = PromptDetector()
@@ -259,6 +270,19 @@ class TestEdgeCases:
         assert result is not None
         assert result.prompt_type == PromptType.PASSWORD
 
+    def test_window_capped_for_long_lines(self):
+        """Test that only the last max_window_chars characters are scanned."""
+        detector = PromptDetector(max_window_chars=100)
+        old_prompt = "Continue? (yes/no)\n" + "x" * 200 + "\n"
+
+        assert detector.detect(old_prompt + "done\n") is None
+
+        result = detector.detect(old_prompt + "y" * 300 + " Password: ")
+
+        assert result is not None
+        assert result.prompt_text == "Password:"
+        assert result.prompt_type == PromptType.PASSWORD
+
 
 class TestPromptDetectionMetadata:
     """Test detection metadata fields."""
@@ -272,6 +296,60 @@ class TestPromptDetectionMetadata:
         assert result is not None
         assert result.timestamp is not None
 
+    def test_timestamp_is_local_wall_clock(self):
+        """Test that the lazily built timestamp reflects detection time."""
+        detector = PromptDetector()
+        before = datetime.now()
+        result = detector.detect("Password: ")
+        after = datetime.now()
+
+        assert result is not None
+        assert before - timedelta(milliseconds=1) <= result.timestamp <= after
+        assert result.to_dict()["timestamp"] == result.timestamp.isoformat()
+
+    def test_detection_accepts_datetime_timestamp(self):
+        """Test that a detection can still be built from a datetime."""
+        stamp = datetime(2025, 11, 14, 10, 30, 0, 123456)
+        detection = PromptDetection(
+            prompt_text="Password:",
+            confidence=0.95,
+            prompt_type=PromptType.PASSWORD,
+            matched_pattern="password",
+            file_position=0,
+            timestamp=stamp,
+        )
+
+        assert detection.timestamp is stamp
+        rebuilt = dataclasses.replace(detection, confidence=0.5)
+        assert rebuilt.confidence == 0.5
+        assert rebuilt.timestamp == stamp
+
+    def test_timestamp_ns_exact_before_epoch(self):
+        """Test that timestamp_ns floors pre-epoch datetimes and round-trips exactly."""
+        stamp = datetime(1969, 12, 31, 23, 59, 59, 500001)
+        detection = PromptDetection(
+            prompt_text="Password:",
+            confidence=0.95,
+            prompt_type=PromptType.PASSWORD,
+            matched_pattern="password",
+            file_position=0,
+            timestamp=stamp,
+        )
+        from_ns = PromptDetection(
+            prompt_text="Password:",
+            confidence=0.95,
+            prompt_type=PromptType.PASSWORD,
+            matched_pattern="password",
+            file_position=0,
+            timestamp_ns=detection.timestamp_ns,
+        )
+
+        expected_ns = (
+            int(datetime(1969, 12, 31, 23, 59, 59).timestamp()) * 1_000_000_000 + 500_001_000
+        )
+        assert detection.timestamp_ns == expected_ns
+        assert from_ns.timestamp == stamp
+
     def test_detection_has_matched_pattern(self):
         """Test that detection includes matched regex pattern."""
         detector = PromptDetector()
@@ -369,6 +447,18 @@ After line 2"""
         # Context should contain the prompt
         assert any("Password" in line for line in context)
 
+    def test_context_centred_on_matched_line(self):
+        """Test that context follows the matched prompt, not an earlier mention."""
+        detector = PromptDetector()
+        # The early "Password:" falls outside the 50-line detection window
+        content = "\n".join(["Password: (old)"] + ["noise"] * 60) + "\nPassword:\nafter"
+
+        result = detector.detect_with_context(content, context_lines=1)
+
+        assert result is not None
+        _, context = result
+        assert context == ["noise", "Password:", "after"]
+
 
 class TestPatternPriority:
     """Test that patterns are matched in priority order."""
@@ -407,6 +497,15 @@ class TestCaseInsensitivity:
         assert result is not None
         assert result.prompt_type == PromptType.PASSWORD
 
+    def test_non_ascii_case_folding(self):
+        """Test that Unicode case folding still matches (long s folds to 's')."""
+        detector = PromptDetector()
+        content = "PA\u017f\u017fWORD: "
+        result = detector.detect(content)
+
+        assert result is not None
+        assert result.prompt_type == PromptType.PASSWORD
+
     def test_mixed_case_yes_no(self):
         """Test mixed case yes/no prompt."""
         detector = PromptDetector()
@@ -415,3 +514,46 @@ class TestCaseInsensitivity:
 
         assert result is not None
         assert result.prompt_type == PromptType.YES_NO
+
+
+class TestDetectDelta:
+    """Test delta-gated detection for polling loops."""
+
+    def test_delta_with_prompt_punctuation_detects(self):
+        """Test that a delta completing a prompt triggers detection."""
+        detector = PromptDetector()
+        content = "Connecting to host\nPassword:"
+        result = detector.detect_delta(":", content)
+
+        assert result is not None
+        assert result.prompt_type == PromptType.PASSWORD
+
+    def test_delta_without_trigger_skips_detection(self):
+        """Test that plain output appended after a prompt is not re-reported."""
+        detector = PromptDetector()
+        content = "Continue? (yes/no)\nworking on it"
+        result = detector.detect_delta("working on it", content)
+
+        assert result is None
+
+    def test_delta_bare_enter_password(self):
+        """Test that the punctuation-free password prompt is still caught."""
+        detector = PromptDetector()
+        content = "Enter your password"
+        result = detector.detect_delta("password", content)
+
+        assert result is not None
+        assert result.prompt_type == PromptType.PASSWORD
+
+    def test_delta_password_split_across_polls(self):
+        """Test that a password keyword split between two polls is still caught."""
+        detector = PromptDetector()
+        result = detector.detect_delta("word", "Enter your password")
+
+        assert result is not None
+        assert result.prompt_type == PromptType.PASSWORD
+
+    def test_empty_delta(self):
+        """Test that an empty delta never triggers detection."""
+        detector = PromptDetector()
+        assert detector.detect_delta("", "Password: ") is None
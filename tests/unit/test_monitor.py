@@ -10,6 +10,8 @@ import pytest
 
 from shellsidekick.core.monitor import SessionMonitor
 from shellsidekick.models.session import Session, SessionState, SessionType
+from shellsidekick.utils import file_utils
+from shellsidekick.utils.file_utils import close_file, read_from_position, read_tail_lines
 
 
 class TestSessionMonitorInit:
@@ -568,3 +570,175 @@ class TestFilePositionTracking:
         content, _ = monitor.get_updates()
         assert content == "New content\n"
         assert "Old content" not in content
+
+
+class TestWaitForUpdate:
+    """Test blocking wait for new log content."""
+
+    def test_returns_immediately_when_content_pending(self, tmp_path):
+        """Test that pending content is returned without waiting."""
+        log_file = tmp_path / "test.log"
+        log_file.write_text("Ready\n")
+
+        session = Session(
+            session_id=str(uuid.uuid4()),
+            session_type=SessionType.FILE,
+            log_file=str(log_file),
+            file_position=0,
+            start_time=datetime.now(),
+            state=SessionState.ACTIVE,
+            metadata={},
+        )
+
+        monitor = SessionMonitor(session)
+        content, has_more = monitor.wait_for_update(timeout=5.0)
+
+        assert content == "Ready\n"
+        assert has_more is False
+
+    def test_times_out_on_idle_log(self, tmp_path):
+        """Test that an idle log returns empty content after the timeout."""
+        log_file = tmp_path / "test.log"
+        log_file.write_text("Ready\n")
+
+        session = Session(
+            session_id=str(uuid.uuid4()),
+            session_type=SessionType.FILE,
+            log_file=str(log_file),
+            file_position=6,
+            start_time=datetime.now(),
+            state=SessionState.ACTIVE,
+            metadata={},
+        )
+
+        monitor = SessionMonitor(session)
+        start = time.monotonic()
+        content, has_more = monitor.wait_for_update(timeout=0.1, poll_interval=0.02)
+
+        assert content == ""
+        assert has_more is False
+        assert time.monotonic() - start >= 0.1
+        assert session.file_position == 6
+
+    def test_missing_file_raises(self, tmp_path):
+        """Test that a missing log surfaces FileNotFoundError and stops the session."""
+        session = Session(
+            session_id=str(uuid.uuid4()),
+            session_type=SessionType.FILE,
+            log_file=str(tmp_path / "missing.log"),
+            file_position=0,
+            start_time=datetime.now(),
+            state=SessionState.ACTIVE,
+            metadata={},
+        )
+
+        monitor = SessionMonitor(session)
+
+        with pytest.raises(FileNotFoundError):
+            monitor.wait_for_update(timeout=0.1)
+        assert session.state == SessionState.STOPPED
+
+
+class TestReadFromPosition:
+    """Test incremental reads through a kept-open descriptor."""
+
+    def test_reads_appended_content(self, tmp_path):
+        """Test that successive reads return only what was appended."""
+        log_file = tmp_path / "test.log"
+        log_file.write_text("one\n")
+
+        try:
+            assert read_from_position(str(log_file), 0) == ("one\n", 4, 4)
+            with open(log_file, "a") as f:
+                f.write("two\r\n")
+            assert read_from_position(str(log_file), 4) == ("two\n", 9, 9)
+            assert read_from_position(str(log_file), 9) == ("", 9, 9)
+        finally:
+            close_file(str(log_file))
+
+    def test_replaced_file_reopened(self, tmp_path):
+        """Test that a file replaced at the same path is read, not the old one."""
+        log_file = tmp_path / "test.log"
+        log_file.write_text("old content\n")
+        read_from_position(str(log_file), 0)
+
+        replacement = tmp_path / "new.log"
+        replacement.write_text("new content\n")
+        os.replace(replacement, log_file)
+
+        try:
+            assert read_from_position(str(log_file), 0)[0] == "new content\n"
+        finally:
+            close_file(str(log_file))
+
+    def test_dropped_monitor_closes_descriptor(self, tmp_path):
+        """Test that a monitor dropped without stop() releases its descriptor."""
+        log_file = tmp_path / "test.log"
+        log_file.write_text("content\n")
+
+        session = Session(
+            session_id=str(uuid.uuid4()),
+            session_type=SessionType.FILE,
+            log_file=str(log_file),
+            file_position=0,
+            start_time=datetime.now(),
+            state=SessionState.ACTIVE,
+            metadata={},
+        )
+        monitor = SessionMonitor(session)
+        monitor.get_updates()
+        assert str(log_file) in file_utils._open_files
+
+        del monitor
+
+        assert str(log_file) not in file_utils._open_files
+
+    def test_close_during_read_waits_for_reader(self, tmp_path, monkeypatch):
+        """Test that closing a file mid-read defers closing its descriptor."""
+        log_file = tmp_path / "test.log"
+        log_file.write_text("content\n")
+        real_pread = os.pread
+        used_fds = []
+
+        def pread_then_close(fd, length, offset):
+            used_fds.append(fd)
+            close_file(str(log_file))
+            # Still readable: the reader holds the descriptor open
+            return real_pread(fd, length, offset)
+
+        monkeypatch.setattr(file_utils.os, "pread", pread_then_close)
+
+        assert read_from_position(str(log_file), 0)[0] == "content\n"
+        assert str(log_file) not in file_utils._open_files
+        with pytest.raises(OSError):
+            os.fstat(used_fds[0])
+
+
+class TestReadTailLines:
+    """Test reading only the tail of a log file."""
+
+    def test_returns_last_lines(self, tmp_path):
+        """Test that only the requested number of trailing lines is returned."""
+        log_file = tmp_path / "test.log"
+        log_file.write_text("\n".join(f"Line {i}" for i in range(100)) + "\nPassword: ")
+
+        assert read_tail_lines(str(log_file), max_lines=3) == "Line 98\nLine 99\nPassword: "
+
+    def test_short_file_returned_whole(self, tmp_path):
+        """Test that files shorter than the limit are returned in full."""
+        log_file = tmp_path / "test.log"
+        log_file.write_bytes(b"one\r\ntwo\rthree")
+
+        assert read_tail_lines(str(log_file), max_lines=50) == "one\ntwo\nthree"
+
+    def test_empty_file(self, tmp_path):
+        """Test that an empty file yields an empty string."""
+        log_file = tmp_path / "test.log"
+        log_file.write_text("")
+
+        assert read_tail_lines(str(log_file)) == ""
+
+    def test_missing_file(self, tmp_path):
+        """Test that a missing file raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            read_tail_lines(str(tmp_path / "missing.log"))
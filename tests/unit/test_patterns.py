@@ -119,6 +119,44 @@ class TestTrackInputEvent:
 
         assert result1["event_id"] != result2["event_id"]
 
+    def test_tracked_event_log_truncates_prompt(self, caplog):
+        """Test that the tracking log line shows at most 50 chars of the prompt."""
+        learner = PatternLearner(auto_load=False)
+
+        with caplog.at_level("INFO", logger="shellsidekick.core.patterns"):
+            result = learner.track_input_event(
+                session_id="s1",
+                prompt_text="x" * 80 + ":",
+                input_text="a",
+                success=True,
+                input_source=InputSource.USER_TYPED,
+                response_time_ms=100,
+            )
+
+        assert caplog.messages[-1] == (
+            f"Tracked input event {result['event_id']} for session s1: "
+            f"prompt='{'x' * 50}...', success=True, pattern_updated=True"
+        )
+
+    def test_event_ids_sort_in_creation_order(self):
+        """Test that event IDs sort lexicographically in the order events were tracked."""
+        learner = PatternLearner(auto_load=False)
+        session_id = str(uuid.uuid4())
+
+        event_ids = [
+            learner.track_input_event(
+                session_id=session_id,
+                prompt_text="Test:",
+                input_text=str(i),
+                success=True,
+                input_source=InputSource.USER_TYPED,
+                response_time_ms=100,
+            )["event_id"]
+            for i in range(20)
+        ]
+
+        assert sorted(event_ids) == event_ids
+
 
 class TestSessionEvents:
     """Test session event retrieval."""
@@ -153,6 +191,47 @@ class TestSessionEvents:
         assert events[0].input_text == "a"
         assert events[1].input_text == "b"
 
+    def test_repeated_prompt_text_shared(self):
+        """Test that events and their pattern share one prompt string."""
+        learner = PatternLearner(auto_load=False)
+        session_id = str(uuid.uuid4())
+
+        for _ in range(2):
+            learner.track_input_event(
+                session_id=session_id,
+                # Built at runtime so each call passes a distinct string object
+                prompt_text="".join(["Continue? ", "(yes/no)"]),
+                input_text="yes",
+                success=True,
+                input_source=InputSource.USER_TYPED,
+                response_time_ms=100,
+            )
+
+        first, second = learner.get_session_events(session_id)
+
+        assert first.prompt_text is second.prompt_text
+        assert learner.get_patterns()[0].prompt_text is first.prompt_text
+
+    def test_repeated_input_text_shared(self):
+        """Test that events and their pattern share one response string."""
+        learner = PatternLearner(auto_load=False)
+        session_id = str(uuid.uuid4())
+
+        for _ in range(2):
+            learner.track_input_event(
+                session_id=session_id,
+                prompt_text="Continue? (yes/no)",
+                input_text="".join(["ye", "s"]),
+                success=True,
+                input_source=InputSource.USER_TYPED,
+                response_time_ms=100,
+            )
+
+        first, second = learner.get_session_events(session_id)
+
+        assert first.input_text is second.input_text
+        assert learner.get_patterns()[0].responses.texts[0] is first.input_text
+
     def test_get_session_events_empty(self):
         """Test retrieving events for nonexistent session."""
         learner = PatternLearner(auto_load=False)
@@ -193,6 +272,72 @@ class TestSessionEvents:
         assert events1[0].input_text == "session1"
         assert events2[0].input_text == "session2"
 
+    def test_old_events_spilled_to_history(self, tmp_path, monkeypatch):
+        """Test that events beyond the in-memory cap move to the history file."""
+        from shellsidekick.core import patterns, storage
+
+        monkeypatch.setattr(storage, "HISTORY_DIR", tmp_path)
+        monkeypatch.setattr(storage, "PATTERNS_FILE", tmp_path / "patterns.json")
+        monkeypatch.setattr(patterns, "MAX_EVENTS_PER_SESSION", 3)
+        monkeypatch.setattr(patterns, "EVENT_SPILL_BATCH_SIZE", 2)
+
+        learner = PatternLearner(auto_load=False)
+        for i in range(8):
+            learner.track_input_event(
+                session_id="s1",
+                prompt_text="Test:",
+                input_text=str(i),
+                success=True,
+                input_source=InputSource.USER_TYPED,
+                response_time_ms=100,
+            )
+
+        # Oldest 5 evicted: two full batches on disk, one event still queued
+        in_memory = [e.input_text for e in learner.get_session_events("s1")]
+        on_disk = [e["input_text"] for e in storage.load_session_history("s1")]
+        assert in_memory == ["5", "6", "7"]
+        assert on_disk == ["0", "1", "2", "3"]
+
+        assert learner.flush() is True
+        on_disk = [e["input_text"] for e in storage.load_session_history("s1")]
+        assert on_disk == ["0", "1", "2", "3", "4"]
+
+    def test_failed_spill_is_retried(self, tmp_path, monkeypatch):
+        """Test that events whose history write failed are kept and saved later."""
+        from shellsidekick.core import patterns, storage
+
+        monkeypatch.setattr(storage, "HISTORY_DIR", tmp_path)
+        monkeypatch.setattr(storage, "PATTERNS_FILE", tmp_path / "patterns.json")
+        monkeypatch.setattr(patterns, "MAX_EVENTS_PER_SESSION", 2)
+        monkeypatch.setattr(patterns, "EVENT_SPILL_BATCH_SIZE", 2)
+
+        calls = []
+
+        def flaky_append(session_id, events):
+            calls.append(len(events))
+            if len(calls) == 1:
+                raise OSError("disk full")
+            storage.append_session_history(session_id, events)
+
+        monkeypatch.setattr(patterns, "append_session_history", flaky_append)
+
+        learner = PatternLearner(auto_load=False)
+        for i in range(6):
+            learner.track_input_event(
+                session_id="s1",
+                prompt_text="Test:",
+                input_text=str(i),
+                success=True,
+                input_source=InputSource.USER_TYPED,
+                response_time_ms=100,
+            )
+
+        assert learner.flush() is True
+        in_memory = [e.input_text for e in learner.get_session_events("s1")]
+        on_disk = [e["input_text"] for e in storage.load_session_history("s1")]
+        assert in_memory == ["4", "5"]
+        assert on_disk == ["0", "1", "2", "3"]
+
 
 class TestPatternCreation:
     """Test pattern creation and updates."""
@@ -217,6 +362,26 @@ class TestPatternCreation:
         assert patterns[0].prompt_text == "Continue? (yes/no)"
         assert patterns[0].total_occurrences == 1
 
+    def test_pattern_timestamps_match_event(self):
+        """Test that a new pattern is stamped with its event's timestamp."""
+        learner = PatternLearner(auto_load=False)
+        session_id = str(uuid.uuid4())
+
+        learner.track_input_event(
+            session_id=session_id,
+            prompt_text="Continue? (yes/no)",
+            input_text="yes",
+            success=True,
+            input_source=InputSource.USER_TYPED,
+            response_time_ms=100,
+        )
+
+        event = learner.get_session_events(session_id)[0]
+        pattern = learner.get_patterns()[0]
+
+        assert pattern.created_at == event.timestamp
+        assert pattern.last_seen == event.timestamp
+
     def test_pattern_updated_on_repeated_prompt(self):
         """Test that pattern is updated for repeated prompts."""
         learner = PatternLearner(auto_load=False)
@@ -304,6 +469,43 @@ class TestPatternCreation:
         assert stats.success_count == 3
         assert stats.success_rate == 0.75
 
+    def test_most_common_response_follows_updates(self):
+        """Test that the most common response is kept current on updates."""
+        learner = PatternLearner(auto_load=False)
+
+        for input_text in ["a", "b", "b"]:
+            learner.track_input_event(
+                session_id="mcr-session",
+                prompt_text="Pick one:",
+                input_text=input_text,
+                success=True,
+                input_source=InputSource.USER_TYPED,
+                response_time_ms=100,
+            )
+            pattern = learner.get_pattern_by_prompt("Pick one:")
+            # Read after every update so a stale value would be observed
+            most_common = pattern.get_most_common_response()
+
+        assert most_common[0] == "b"
+        assert most_common[1].count == 2
+
+    def test_most_common_response_tie_keeps_earliest(self):
+        """Test that a response catching up to the leader does not displace it."""
+        learner = PatternLearner(auto_load=False)
+
+        for input_text in ["a", "b", "b", "a"]:
+            learner.track_input_event(
+                session_id="mcr-session",
+                prompt_text="Pick one:",
+                input_text=input_text,
+                success=True,
+                input_source=InputSource.USER_TYPED,
+                response_time_ms=100,
+            )
+
+        pattern = learner.get_pattern_by_prompt("Pick one:")
+        assert pattern.get_most_common_response()[0] == "a"
+
 
 class TestPatternIdGeneration:
     """Test pattern ID generation."""
@@ -390,6 +592,19 @@ class TestPatternIdGeneration:
         patterns = learner.get_patterns()
         assert len(patterns) == 1
 
+    def test_repeated_prompt_id_is_cached(self):
+        """Test that pattern IDs for recurring prompts come from the cache."""
+        from shellsidekick.core.patterns import _pattern_id_for
+
+        learner = PatternLearner(auto_load=False)
+        _pattern_id_for.cache_clear()
+
+        first = learner._generate_pattern_id("Cached prompt:")
+        second = learner._generate_pattern_id("Cached prompt:")
+
+        assert first == second
+        assert _pattern_id_for.cache_info().hits == 1
+
 
 class TestPatternRetrieval:
     """Test pattern retrieval methods."""
@@ -499,6 +714,23 @@ class TestFormattedPatterns:
         assert result["total_patterns"] == 1
         assert "Delete" in result["patterns"][0]["prompt_text"]
 
+    def test_filter_sees_patterns_added_after_a_query(self):
+        """Test that prompt filtering picks up patterns learned after an earlier filter."""
+        learner = PatternLearner(auto_load=False)
+
+        for prompt_text in ["Delete file?", "Continue?", "Delete branch?"]:
+            learner.track_input_event(
+                session_id="s1",
+                prompt_text=prompt_text,
+                input_text="yes",
+                success=True,
+                input_source=InputSource.USER_TYPED,
+                response_time_ms=100,
+            )
+            result = learner.get_patterns_formatted(prompt_filter="delete", sort_by="none")
+
+        assert [p["prompt_text"] for p in result["patterns"]] == ["Delete file?", "Delete branch?"]
+
     def test_filter_by_min_occurrences(self):
         """Test filtering by minimum occurrences."""
         learner = PatternLearner(auto_load=False)
@@ -554,6 +786,31 @@ class TestFormattedPatterns:
         assert result["patterns"][1]["total_occurrences"] == 2
         assert result["patterns"][2]["total_occurrences"] == 1
 
+    def test_limit_returns_top_patterns(self):
+        """Test that limit keeps only the top-sorted patterns."""
+        learner = PatternLearner(auto_load=False)
+        session_id = str(uuid.uuid4())
+
+        for i in range(5):
+            for _ in range(i + 1):  # 1..5 occurrences
+                learner.track_input_event(
+                    session_id=session_id,
+                    prompt_text=f"Prompt {i}",
+                    input_text="test",
+                    success=i % 2 == 0,
+                    input_source=InputSource.USER_TYPED,
+                    response_time_ms=100,
+                )
+
+        result = learner.get_patterns_formatted(sort_by="occurrences", limit=2)
+
+        assert result["total_patterns"] == 2
+        assert [p["total_occurrences"] for p in result["patterns"]] == [5, 4]
+
+        full = learner.get_patterns_formatted(sort_by="success_rate")
+        top = learner.get_patterns_formatted(sort_by="success_rate", limit=3)
+        assert top["patterns"] == full["patterns"][:3]
+
 
 class TestPatternPersistence:
     """Test save/load functionality."""
@@ -611,6 +868,96 @@ class TestPatternPersistence:
         assert len(patterns) == 1
         assert patterns[0].prompt_text == "Test prompt"
 
+    def test_serialized_pattern_refreshed_after_changes(self):
+        """Test that the memoized serialized dict reflects later updates."""
+        learner = PatternLearner(auto_load=False)
+        for input_text in ["a", "b"]:
+            learner.track_input_event(
+                session_id="s1",
+                prompt_text="Choose:",
+                input_text=input_text,
+                success=True,
+                input_source=InputSource.USER_TYPED,
+                response_time_ms=100,
+            )
+            pattern = learner.get_pattern_by_prompt("Choose:")
+            data = pattern._serialized()
+            assert pattern._serialized() is data
+
+        assert data["total_occurrences"] == 2
+        assert list(data["responses"]) == ["a", "b"]
+
+        pattern.pattern_id = "rekeyed"
+        assert pattern.to_dict()["pattern_id"] == "rekeyed"
+
+    def test_to_dict_returns_callers_own_dict(self):
+        """Test that mutating a to_dict() result leaves the pattern's data intact."""
+        learner = PatternLearner(auto_load=False)
+        learner.track_input_event(
+            session_id="s1",
+            prompt_text="Choose:",
+            input_text="a",
+            success=True,
+            input_source=InputSource.USER_TYPED,
+            response_time_ms=100,
+        )
+        pattern = learner.get_pattern_by_prompt("Choose:")
+
+        data = pattern.to_dict()
+        data["total_occurrences"] = 99
+        data["responses"]["a"]["count"] = 99
+        data["responses"]["b"] = {"count": 1, "success_count": 1}
+
+        assert pattern.to_dict() == pattern._serialized()
+        assert pattern.to_dict()["total_occurrences"] == 1
+        assert pattern.to_dict()["responses"] == {"a": {"count": 1, "success_count": 1}}
+
+    def test_last_seen_iso_follows_updates(self):
+        """Test that the cached ISO last_seen is refreshed when last_seen changes."""
+        learner = PatternLearner(auto_load=False)
+        learner.track_input_event(
+            session_id="s1",
+            prompt_text="Choose:",
+            input_text="a",
+            success=True,
+            input_source=InputSource.USER_TYPED,
+            response_time_ms=100,
+        )
+        pattern = learner.get_pattern_by_prompt("Choose:")
+        assert pattern.last_seen_iso == pattern.last_seen.isoformat()
+
+        pattern.last_seen = datetime(2030, 1, 2, 3, 4, 5)
+
+        assert pattern.last_seen_iso == "2030-01-02T03:04:05"
+        assert pattern.to_dict()["last_seen"] == "2030-01-02T03:04:05"
+
+    def test_response_counts_round_trip(self, tmp_path, monkeypatch):
+        """Test that per-response counts survive save/load in insertion order."""
+        from shellsidekick.core import storage
+
+        monkeypatch.setattr(storage, "PATTERNS_FILE", tmp_path / "patterns.json")
+
+        learner1 = PatternLearner(auto_load=False)
+        session_id = str(uuid.uuid4())
+        for input_text, success in [("b", True), ("a", False), ("b", False), ("a", True)]:
+            learner1.track_input_event(
+                session_id=session_id,
+                prompt_text="Choose:",
+                input_text=input_text,
+                success=success,
+                input_source=InputSource.USER_TYPED,
+                response_time_ms=100,
+            )
+        learner1.save_to_storage()
+
+        pattern = PatternLearner(auto_load=True).get_pattern_by_prompt("Choose:")
+
+        assert list(pattern.responses) == ["b", "a"]
+        assert pattern.responses["b"].count == 2
+        assert pattern.responses["b"].success_count == 1
+        assert pattern.responses["a"].success_rate == 0.5
+        assert pattern.get_most_common_response()[0] == "b"
+
     def test_persistence_across_restarts(self, tmp_path, monkeypatch):
         """Test patterns survive multiple save/load cycles."""
         from shellsidekick.core import storage
@@ -647,3 +994,133 @@ class TestPatternPersistence:
         patterns = learner3.get_patterns()
 
         assert len(patterns) == 2
+
+    def test_load_rekeys_legacy_pattern_ids(self, tmp_path, monkeypatch):
+        """Test that patterns saved with old-style IDs are found after loading."""
+        import json
+
+        from shellsidekick.core import storage
+
+        test_file = tmp_path / "patterns.json"
+        monkeypatch.setattr(storage, "PATTERNS_FILE", test_file)
+        now = datetime.now().isoformat()
+        legacy = {
+            "pattern_id": "0123456789abcdef",
+            "prompt_text": "Legacy prompt:",
+            "responses": {"ok": {"count": 2, "success_count": 2}},
+            "total_occurrences": 2,
+            "last_seen": now,
+            "created_at": now,
+        }
+        test_file.write_text(json.dumps({"patterns": [legacy]}))
+
+        learner = PatternLearner(auto_load=True)
+        pattern = learner.get_pattern_by_prompt("Legacy prompt:")
+
+        assert pattern is not None
+        assert pattern.responses["ok"].count == 2
+        assert pattern.pattern_id == learner._generate_pattern_id("Legacy prompt:")
+
+    def test_load_is_all_or_nothing(self, tmp_path, monkeypatch):
+        """Test that a corrupt record leaves already-known patterns untouched."""
+        import json
+
+        from shellsidekick.core import storage
+
+        test_file = tmp_path / "patterns.json"
+        monkeypatch.setattr(storage, "PATTERNS_FILE", test_file)
+        now = datetime.now().isoformat()
+        good = {
+            "pattern_id": "x",
+            "prompt_text": "Good prompt:",
+            "responses": {},
+            "total_occurrences": 1,
+            "last_seen": now,
+            "created_at": now,
+        }
+        test_file.write_text(json.dumps({"patterns": [good, {"prompt_text": "broken"}]}))
+
+        learner = PatternLearner(auto_load=False)
+
+        assert learner.load_from_storage() == 0
+        assert learner.get_patterns() == []
+
+
+class TestBatchedSaves:
+    """Test that pattern saves are batched and flushed."""
+
+    def _track(self, learner, prompt_text, input_text="a"):
+        learner.track_input_event(
+            session_id="batch-session",
+            prompt_text=prompt_text,
+            input_text=input_text,
+            success=True,
+            input_source=InputSource.USER_TYPED,
+            response_time_ms=100,
+        )
+
+    def test_updates_within_interval_are_deferred(self, tmp_path, monkeypatch):
+        """Test that only the first update in an interval is written immediately."""
+        from shellsidekick.core import storage
+
+        test_file = tmp_path / "patterns.json"
+        monkeypatch.setattr(storage, "PATTERNS_FILE", test_file)
+
+        learner = PatternLearner(auto_load=False)
+        self._track(learner, "First:")
+        self._track(learner, "Second:")
+
+        assert len(PatternLearner(auto_load=True).get_patterns()) == 1
+
+        assert learner.flush() is True
+        assert len(PatternLearner(auto_load=True).get_patterns()) == 2
+
+    def test_batch_size_forces_save(self, tmp_path, monkeypatch):
+        """Test that enough pending updates are saved without waiting."""
+        from shellsidekick.core import patterns, storage
+
+        test_file = tmp_path / "patterns.json"
+        monkeypatch.setattr(storage, "PATTERNS_FILE", test_file)
+        monkeypatch.setattr(patterns, "SAVE_BATCH_SIZE", 3)
+
+        learner = PatternLearner(auto_load=False)
+        for idx in range(4):
+            self._track(learner, f"Prompt {idx}:")
+
+        assert len(PatternLearner(auto_load=True).get_patterns()) == 4
+        learner.flush()
+
+    def test_event_batch_saved_once(self, tmp_path, monkeypatch):
+        """Test that track_input_events applies the save policy once per batch."""
+        from shellsidekick.core import patterns, storage
+
+        monkeypatch.setattr(storage, "PATTERNS_FILE", tmp_path / "patterns.json")
+        monkeypatch.setattr(patterns, "SAVE_BATCH_SIZE", 3)
+        learner = PatternLearner(auto_load=False)
+        saves = []
+        monkeypatch.setattr(learner, "save_to_storage", lambda: saves.append(1) or True)
+
+        results = learner.track_input_events(
+            {
+                "session_id": "batch-session",
+                "prompt_text": f"Prompt {idx}:",
+                "input_text": "a",
+                "success": True,
+                "input_source": InputSource.USER_TYPED,
+                "response_time_ms": 100,
+            }
+            for idx in range(7)
+        )
+
+        assert len(saves) == 1
+        assert [r["pattern_updated"] for r in results] == [True] * 7
+        assert [e.event_id for e in learner.get_session_events("batch-session")] == [
+            r["event_id"] for r in results
+        ]
+        assert len(learner.get_patterns()) == 7
+
+    def test_flush_without_pending_updates(self):
+        """Test that flushing a clean learner is a no-op."""
+        learner = PatternLearner(auto_load=False)
+
+        assert learner.flush() is True
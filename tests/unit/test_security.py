@@ -2,6 +2,7 @@
 
 import pytest
 
+from shellsidekick.utils import security
 from shellsidekick.utils.security import (
     get_dangerous_keywords,
     is_dangerous_operation,
@@ -57,6 +58,11 @@ class TestPasswordPromptDetection:
         text = "Please provide credentials\nPassword:"
         assert is_password_prompt(text) is True
 
+    def test_non_ascii_case_folding(self):
+        """Test that Unicode case-insensitive matches survive the keyword prefilter."""
+        # "ſ" (long s) matches "s" case-insensitively but lowercases to itself
+        assert is_password_prompt("PAſſWORD:") is True
+
 
 class TestDangerousOperationDetection:
     """Test dangerous operation detection."""
@@ -131,6 +137,12 @@ class TestDangerousOperationDetection:
         assert is_dangerous_operation("DELETE FROM TABLE") is True
         assert is_dangerous_operation("DROP TABLE") is True
 
+    def test_non_ascii_case_folding_dangerous(self):
+        """Test that Unicode case-insensitive matches survive the literal prefilter."""
+        # "ſ" (long s) matches "s" case-insensitively but lowercases to itself
+        assert is_dangerous_operation("DEſTROY everything") is True
+        assert get_dangerous_keywords("mkfſ /dev/sda") == ["mkfſ"]
+
     def test_safe_operations_not_flagged(self):
         """Test that safe operations are not flagged."""
         assert is_dangerous_operation("ls -la") is False
@@ -293,3 +305,20 @@ class TestSecurityEdgeCases:
         text = "password: p@ssw0rd!#$%"
         result = redact_password(text)
         assert "p@ssw0rd!#$%" not in result
+
+    def test_repeated_checks_are_memoized(self):
+        """Test that repeated prompt checks are served from the cache."""
+        text = "Drop table users? (yes/no)"
+        security._is_dangerous_operation_cached.cache_clear()
+
+        assert is_dangerous_operation(text) is True
+        assert is_dangerous_operation(text) is True
+        assert security._is_dangerous_operation_cached.cache_info().hits == 1
+
+    def test_long_texts_are_not_cached(self):
+        """Test that texts over the length cap bypass the cache."""
+        text = "x" * security.CACHE_MAX_TEXT_LENGTH + " drop table users"
+        security._is_dangerous_operation_cached.cache_clear()
+
+        assert is_dangerous_operation(text) is True
+        assert security._is_dangerous_operation_cached.cache_info().currsize == 0
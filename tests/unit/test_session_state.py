@@ -0,0 +1,44 @@
+"""Unit tests for the shared session state."""
+
+import subprocess
+import sys
+
+from shellsidekick.core.patterns import PatternLearner
+from shellsidekick.mcp import session_state
+
+
+class TestPatternLearnerSingleton:
+    """Test the lazily created global pattern learner."""
+
+    def test_import_does_not_create_learner(self):
+        """Test importing the module leaves the learner unset."""
+        # A fresh interpreter, since this one may already have created it
+        code = (
+            "from shellsidekick.mcp import session_state\n"
+            "assert session_state._pattern_learner is None\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+
+        assert result.returncode == 0, result.stderr
+
+    def test_repeated_calls_return_same_instance(self, tmp_path, monkeypatch):
+        """Test the learner is created once and then reused."""
+        from shellsidekick.core import storage
+
+        monkeypatch.setattr(storage, "HISTORY_DIR", tmp_path / "history")
+        monkeypatch.setattr(storage, "PATTERNS_FILE", tmp_path / "patterns.json")
+        monkeypatch.setattr(session_state, "_pattern_learner", None)
+
+        learner = session_state.get_pattern_learner()
+
+        assert isinstance(learner, PatternLearner)
+        assert session_state.get_pattern_learner() is learner
+        assert session_state._pattern_learner is learner
+
+    def test_flush_without_learner_is_noop(self, monkeypatch):
+        """Test flushing never creates the learner."""
+        monkeypatch.setattr(session_state, "_pattern_learner", None)
+
+        session_state.flush_pattern_learner()
+
+        assert session_state._pattern_learner is None
@@ -0,0 +1,285 @@
+"""Unit tests for JSON storage utilities."""
+
+import json
+import os
+import re
+
+import pytest
+
+from shellsidekick.core.storage import compile_search_pattern, load_json, save_json
+
+
+class TestSaveJson:
+    """Test atomic JSON writes."""
+
+    def test_writes_document_with_secure_permissions(self, tmp_path):
+        """Test that the saved file round-trips and is user-only."""
+        target = tmp_path / "data.json"
+
+        save_json(target, {"patterns": [1, 2, 3]})
+
+        assert load_json(target) == {"patterns": [1, 2, 3]}
+        assert os.stat(target).st_mode & 0o777 == 0o600
+
+    def test_compact_unless_pretty_requested(self, tmp_path, monkeypatch):
+        """Test that output is compact by default and indented in pretty mode."""
+        from shellsidekick.core import storage
+
+        compact = tmp_path / "compact.json"
+        pretty = tmp_path / "pretty.json"
+
+        save_json(compact, {"a": [1, 2]})
+        monkeypatch.setattr(storage, "PRETTY_JSON", True)
+        save_json(pretty, {"a": [1, 2]})
+
+        assert compact.read_text() == '{"a":[1,2]}'
+        assert "\n" in pretty.read_text()
+        assert load_json(pretty) == load_json(compact)
+
+    def test_no_temporary_files_left_behind(self, tmp_path):
+        """Test that the temporary file is renamed onto the target."""
+        target = tmp_path / "data.json"
+
+        save_json(target, {"a": 1})
+        save_json(target, {"a": 2})
+
+        assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
+
+    def test_identical_document_not_rewritten(self, tmp_path):
+        """Test that saving unchanged data leaves the file untouched."""
+        target = tmp_path / "data.json"
+        save_json(target, {"a": 1})
+        inode = os.stat(target).st_ino
+
+        save_json(target, {"a": 1})
+
+        assert os.stat(target).st_ino == inode
+
+    def test_externally_modified_file_rewritten(self, tmp_path):
+        """Test that a file changed behind our back is written again."""
+        target = tmp_path / "data.json"
+        save_json(target, {"a": 1})
+        target.write_text(json.dumps({"a": "other writer"}))
+
+        save_json(target, {"a": 1})
+
+        assert load_json(target) == {"a": 1}
+
+
+class TestLoadJson:
+    """Test JSON loading."""
+
+    def test_missing_file_returns_empty_dict(self, tmp_path):
+        """Test that a missing file loads as an empty document."""
+        assert load_json(tmp_path / "missing.json") == {}
+
+    def test_loads_utf8_document(self, tmp_path):
+        """Test that non-ASCII content is decoded correctly."""
+        target = tmp_path / "data.json"
+        target.write_bytes('{"prompt": "Mot de passe é:"}'.encode("utf-8"))
+
+        assert load_json(target) == {"prompt": "Mot de passe é:"}
+
+
+class TestCleanupOldFiles:
+    """Test retention cleanup of the storage directory."""
+
+    def test_removes_expired_files_recursively(self, tmp_path, monkeypatch):
+        """Test that old files are deleted in nested dirs but patterns are kept."""
+        import time
+
+        from shellsidekick.core import storage
+
+        monkeypatch.setattr(storage, "STORAGE_DIR", tmp_path)
+        monkeypatch.setattr(storage, "PATTERNS_FILE", tmp_path / "patterns.json")
+
+        history = tmp_path / "history"
+        history.mkdir()
+        old_files = [history / f"old-{i}.json" for i in range(3)]
+        recent = history / "recent.json"
+        patterns = tmp_path / "patterns.json"
+        for path in [*old_files, recent, patterns]:
+            path.write_text("{}")
+
+        ten_days_ago = time.time() - 10 * 24 * 60 * 60
+        for path in [*old_files, patterns]:
+            os.utime(path, (ten_days_ago, ten_days_ago))
+
+        deleted, bytes_freed = storage.cleanup_old_files(retention_days=7)
+
+        assert sorted(deleted) == sorted(str(p) for p in old_files)
+        assert bytes_freed == 6
+        assert not any(p.exists() for p in old_files)
+        assert recent.exists()
+        assert patterns.exists()
+
+    def test_dry_run_keeps_files(self, tmp_path, monkeypatch):
+        """Test that dry run reports but does not delete."""
+        import time
+
+        from shellsidekick.core import storage
+
+        monkeypatch.setattr(storage, "STORAGE_DIR", tmp_path)
+        old_file = tmp_path / "old.json"
+        old_file.write_text("{}")
+        ten_days_ago = time.time() - 10 * 24 * 60 * 60
+        os.utime(old_file, (ten_days_ago, ten_days_ago))
+
+        deleted, _ = storage.cleanup_old_files(retention_days=7, dry_run=True)
+
+        assert deleted == [str(old_file)]
+        assert old_file.exists()
+
+    def test_missing_storage_dir(self, tmp_path, monkeypatch):
+        """Test that a missing storage directory yields nothing to clean."""
+        from shellsidekick.core import storage
+
+        monkeypatch.setattr(storage, "STORAGE_DIR", tmp_path / "missing")
+
+        assert storage.cleanup_old_files() == ([], 0)
+
+
+class TestCompileSearchPattern:
+    """Test shared compilation of search queries."""
+
+    def test_same_query_compiled_once(self):
+        """Test that repeated queries reuse one compiled pattern."""
+        assert compile_search_pattern(r"error \d+") is compile_search_pattern(r"error \d+")
+
+    def test_invalid_query_raises(self):
+        """Test that invalid patterns raise re.error."""
+        with pytest.raises(re.error):
+            compile_search_pattern("[unclosed")
+
+
+class TestSearchLogFile:
+    """Test streaming log search."""
+
+    def test_context_spans_neighbouring_matches(self, tmp_path):
+        """Test that overlapping context windows are filled for every match."""
+        from shellsidekick.core.storage import search_log_file
+
+        log_file = tmp_path / "session.log"
+        log_file.write_text("a\nerror 1\nerror 2\nb\nc\n")
+
+        results = search_log_file(str(log_file), r"error", context_lines=1, max_results=10)
+
+        assert [r["line_number"] for r in results] == [2, 3]
+        assert results[0]["context_before"] == ["a"]
+        assert results[0]["context_after"] == ["error 2"]
+        assert results[1]["context_before"] == ["error 1"]
+        assert results[1]["context_after"] == ["b"]
+
+    def test_context_truncated_at_end_of_file(self, tmp_path):
+        """Test that a match near EOF is returned with the lines available."""
+        from shellsidekick.core.storage import search_log_file
+
+        log_file = tmp_path / "session.log"
+        log_file.write_text("x\ny\nlast error")
+
+        results = search_log_file(str(log_file), r"error", context_lines=3, max_results=10)
+
+        assert results == [
+            {
+                "matched_text": "last error",
+                "line_number": 3,
+                "context_before": ["x", "y"],
+                "context_after": [],
+            }
+        ]
+
+    def test_literal_and_regex_queries_agree(self, tmp_path):
+        """Test that the substring fast path matches what the regex would."""
+        from shellsidekick.core.storage import search_log_file
+
+        log_file = tmp_path / "session.log"
+        log_file.write_text("connect: refused\nok\nretry #2: connect: refused\n")
+
+        literal = search_log_file(str(log_file), "connect: refused", max_results=10)
+        regex = search_log_file(str(log_file), "connect: (refused)", max_results=10)
+
+        assert [r["line_number"] for r in literal] == [1, 3]
+        assert literal == regex
+
+    def test_literal_search_decodes_invalid_utf8_with_replacement(self, tmp_path):
+        """Test that undecodable bytes in a log do not abort a substring search."""
+        from shellsidekick.core.storage import search_log_file
+
+        log_file = tmp_path / "session.log"
+        log_file.write_bytes(b"noise \xff\nfatal error\n")
+
+        results = search_log_file(str(log_file), "fatal", context_lines=1, max_results=10)
+
+        assert results[0]["line_number"] == 2
+        assert results[0]["context_before"] == ["noise �"]
+
+    def test_literal_search_handles_crlf_logs(self, tmp_path):
+        """Test that CRLF line endings are stripped like universal newlines."""
+        from shellsidekick.core.storage import search_log_file
+
+        log_file = tmp_path / "session.log"
+        log_file.write_bytes(b"first\r\nerror here\r\nlast\r\n")
+
+        results = search_log_file(str(log_file), "error", context_lines=1, max_results=10)
+
+        assert results == [
+            {
+                "matched_text": "error here",
+                "line_number": 2,
+                "context_before": ["first"],
+                "context_after": ["last"],
+            }
+        ]
+
+    def test_query_with_newline_does_not_span_lines(self, tmp_path):
+        """Test that a line break in a plain query never matches across lines."""
+        from shellsidekick.core.storage import search_log_file
+
+        log_file = tmp_path / "session.log"
+        log_file.write_text("xa\nby\n")
+
+        assert search_log_file(str(log_file), "a\nb", max_results=10) == []
+
+
+class TestSessionHistory:
+    """Test session history persistence."""
+
+    def test_appended_events_follow_saved_history(self, tmp_path, monkeypatch):
+        """Test that appended events load after the saved ones, in order."""
+        from shellsidekick.core import storage
+
+        monkeypatch.setattr(storage, "HISTORY_DIR", tmp_path)
+
+        storage.save_session_history("s1", [{"n": 0}])
+        storage.append_session_history("s1", [{"n": 1}, {"n": 2}])
+        storage.append_session_history("s1", [{"n": 3}])
+
+        assert storage.load_session_history("s1") == [{"n": i} for i in range(4)]
+
+    def test_save_replaces_appended_events(self, tmp_path, monkeypatch):
+        """Test that saving a full history drops previously appended events."""
+        from shellsidekick.core import storage
+
+        monkeypatch.setattr(storage, "HISTORY_DIR", tmp_path)
+
+        storage.append_session_history("s1", [{"n": 1}])
+        storage.save_session_history("s1", [{"n": 9}])
+
+        assert storage.load_session_history("s1") == [{"n": 9}]
+
+    def test_interrupted_append_ignored(self, tmp_path, monkeypatch):
+        """Test that a partially written line is skipped, also after later appends."""
+        from shellsidekick.core import storage
+
+        monkeypatch.setattr(storage, "HISTORY_DIR", tmp_path)
+
+        storage.append_session_history("s1", [{"n": 1}])
+        with open(tmp_path / "s1.jsonl", "ab") as f:
+            f.write(b'{"n":')
+
+        assert storage.load_session_history("s1") == [{"n": 1}]
+
+        storage.append_session_history("s1", [{"n": 2}])
+
+        assert storage.load_session_history("s1") == [{"n": 1}, {"n": 2}]
+        assert os.stat(tmp_path / "s1.jsonl").st_mode & 0o777 == 0o600